@@ -0,0 +1,375 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import argparse
+import json
+import os
+import pathlib
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+
+PATH_REPOSITORY = pathlib.Path(__file__).absolute().parent.parent
+FILE_BASELINE = PATH_REPOSITORY / 'benchmarks' / 'baseline.json'
+DEFAULT_SIZES = '100,1000,5000'
+# The system data directories provide the GSettings schemas and the icon
+# themes after the synthetic data directories
+DEFAULT_DATA_DIRS = '/usr/local/share:/usr/share'
+ICON_SIZE = 48
+# Every tenth application uses a missing icon
+MISSING_ICONS_RATIO = 10
+# Every fifth folder uses a desktop directory file for its name
+DIRECTORY_FOLDERS_RATIO = 5
+
+
+def create_png(path, size):
+    """Write a solid color PNG image"""
+    def chunk(chunk_type, data):
+        return (struct.pack('>I', len(data)) + chunk_type + data +
+                struct.pack('>I', zlib.crc32(chunk_type + data)))
+    rows = b''.join(b'\x00' + b'\x3c\x6e\xb4\xff' * size
+                    for _ in range(size))
+    with open(path, 'wb') as file:
+        file.write(b'\x89PNG\r\n\x1a\n' +
+                   chunk(b'IHDR', struct.pack('>IIBBBBB',
+                                              size, size, 8, 6, 0, 0, 0)) +
+                   chunk(b'IDAT', zlib.compress(rows)) +
+                   chunk(b'IEND', b''))
+
+
+def create_tree(path, applications, folders, data_dirs):
+    """Create the XDG data directories with the desktop files and return
+    the folders layout"""
+    paths_data = [path / f'data{index}' for index in range(data_dirs)]
+    path_icons = paths_data[0] / 'icons' / 'hicolor'
+    (path_icons / f'{ICON_SIZE}x{ICON_SIZE}' / 'apps').mkdir(parents=True)
+    with open(path_icons / 'index.theme', 'w') as file:
+        file.write('[Icon Theme]\n'
+                   'Name=Hicolor\n'
+                   f'Directories={ICON_SIZE}x{ICON_SIZE}/apps\n\n'
+                   f'[{ICON_SIZE}x{ICON_SIZE}/apps]\n'
+                   f'Size={ICON_SIZE}\n'
+                   'Type=Fixed\n')
+    icon_names = []
+    desktop_ids = []
+    for index in range(applications):
+        icon_name = f'bench-icon-{index}'
+        if index % MISSING_ICONS_RATIO == 0:
+            icon_name = f'bench-missing-{index}'
+        else:
+            create_png(path_icons / f'{ICON_SIZE}x{ICON_SIZE}' / 'apps' /
+                       f'{icon_name}.png', ICON_SIZE)
+        icon_names.append(icon_name)
+        # Spread the desktop files across the data directories and their
+        # subdirectories
+        path_applications = paths_data[index % data_dirs] / 'applications'
+        prefix = ''
+        if index % 7 == 0:
+            path_applications /= 'bench'
+            prefix = 'bench-'
+        path_applications.mkdir(parents=True, exist_ok=True)
+        with open(path_applications / f'app{index}.desktop', 'w') as file:
+            file.write('[Desktop Entry]\n'
+                       'Type=Application\n'
+                       f'Name=Application {index}\n'
+                       f'Comment=Synthetic application number {index}\n'
+                       f'Icon={icon_name}\n'
+                       'Exec=true\n'
+                       f'Categories=Bench{index % 20};\n'
+                       f'NoDisplay={"true" if index % 13 == 0 else "false"}'
+                       '\n')
+        desktop_ids.append(f'{prefix}app{index}.desktop')
+    path_directories = paths_data[-1] / 'desktop-directories'
+    path_directories.mkdir(parents=True)
+    layout = []
+    for index in range(folders):
+        name = f'Folder {index}'
+        if index % DIRECTORY_FOLDERS_RATIO == 0:
+            name = f'bench-folder{index}.directory'
+            with open(path_directories / name, 'w') as file:
+                file.write('[Desktop Entry]\n'
+                           'Type=Directory\n'
+                           f'Name=Directory folder {index}\n'
+                           f'Icon={icon_names[index % applications]}\n')
+        # Assign the applications in round robin, with some missing ones
+        apps = desktop_ids[index::folders]
+        apps.append(f'bench-missing-{index}.desktop')
+        layout.append({'folder': f'bench-folder-{index}',
+                       'name': name,
+                       'translate': False,
+                       'apps': apps,
+                       'categories': [f'Bench{index % 20}']})
+    return paths_data, icon_names, {'version': 1, 'folders': layout}
+
+
+def measure(results, trace_memory, operation, function, *args):
+    """Execute a function and record its time or its peak memory, tracing
+    the memory slows down the function and would alter the time"""
+    if trace_memory:
+        tracemalloc.start()
+        result = function(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[operation] = {'peak': peak}
+    else:
+        started = time.perf_counter()
+        result = function(*args)
+        results[operation] = {'time': time.perf_counter() - started}
+    return result
+
+
+def run_operations(path, trace_memory):
+    """Execute the operations on the prepared tree and return the results"""
+    sys.path.insert(0, str(PATH_REPOSITORY))
+    import gnome_appfolders_manager.requires                       # noqa: F401
+    from gi.repository import Gtk
+    from gnome_appfolders_manager.command_line_options import (
+        CommandLineOptions)
+    from gnome_appfolders_manager.functions import get_pixbuf_from_icon_name
+    from gnome_appfolders_manager.models.category_index import (
+        get_category_index)
+    from gnome_appfolders_manager.models.folder_rules import (
+        FolderRulesEngine)
+    from gnome_appfolders_manager.models.folders_layout import FoldersLayout
+    from gnome_appfolders_manager.models.folders_list import FoldersList
+    from gnome_appfolders_manager.models.folders_report import FoldersReport
+    from gnome_appfolders_manager.pixbuf_cache import pixbuf_cache
+    from gnome_appfolders_manager.translations import load_translations
+    from gnome_appfolders_manager.ui.application_picker import (
+        UIApplicationPicker)
+    from gnome_appfolders_manager.ui.main import UIMain
+
+    def flush_events():
+        while Gtk.events_pending():
+            Gtk.main_iteration()
+
+    def import_layout():
+        folders_layout = FoldersLayout(folders_list=FoldersList())
+        folders_layout.apply(*folders_layout.get_changes(layout))
+
+    def reload_folders():
+        ui.model_folders.clear()
+        for folder_name in list(ui.folders):
+            ui.do_remove_folder(folder_name)
+        ui.do_reload_folders()
+
+    def select_folders():
+        for index in range(len(ui.model_folders)):
+            ui.ui.treeview_folders.set_cursor(index)
+        flush_events()
+
+    def load_picker():
+        picker = UIApplicationPicker(parent=ui.ui.window,
+                                     settings=ui.settings,
+                                     options=ui.options,
+                                     catalog=ui.catalog,
+                                     folders_index=ui.folders_index,
+                                     existing_files=[])
+        for _ in picker.loader:
+            pass
+        flush_events()
+        picker.destroy()
+
+    def load_icons():
+        for icon_name in icon_names:
+            get_pixbuf_from_icon_name(icon_name, ICON_SIZE)
+
+    def assign_rules():
+        category_index = get_category_index()
+        category_index.refresh()
+        engine = FolderRulesEngine(category_index=category_index)
+        # Every rule also includes the categories of its own folder
+        rules = engine.load_rules({
+            'version': 1,
+            'rules': [{'folder': item['folder'],
+                       'categories': [*item['categories'],
+                                      f'Bench{(index + 1) % 20}']}
+                      for index, item in enumerate(layout['folders'])]})
+        engine.apply(engine.propose(rules))
+
+    def get_redundant():
+        report = FoldersReport(folders_list=FoldersList())
+        report.scan()
+        return {(folder, application)
+                for folder, applications in report.redundant.items()
+                for application in applications}
+
+    with open(path / 'layout.json', 'r') as file:
+        layout = json.load(file)
+    with open(path / 'icons.json', 'r') as file:
+        icon_names = json.load(file)
+    sys.argv = [sys.argv[0]]
+    options = CommandLineOptions().parse_options()
+    load_translations()
+    results = {}
+    measure(results, trace_memory, 'import_layout', import_layout)
+    ui = measure(results, trace_memory, 'main_startup', UIMain, None, options)
+    measure(results, trace_memory, 'do_reload_folders', reload_folders)
+    measure(results, trace_memory, 'folders_cursor_changed', select_folders)
+    measure(results, trace_memory, 'picker_startup_cold', load_picker)
+    measure(results, trace_memory, 'picker_startup_warm', load_picker)
+    pixbuf_cache.clear()
+    measure(results, trace_memory, 'icons_cold', load_icons)
+    measure(results, trace_memory, 'icons_warm', load_icons)
+    redundant = get_redundant()
+    measure(results, trace_memory, 'assign_rules', assign_rules)
+    # The assigned applications must never be reported as redundant
+    added = get_redundant() - redundant
+    if added:
+        raise RuntimeError(f'Redundant applications assigned: {added}')
+    ui.desktop_monitor.stop()
+    return results
+
+
+def run_size(arguments, applications):
+    """Prepare a tree and execute the operations in a new process"""
+    path = pathlib.Path(tempfile.mkdtemp(prefix='appfolders-benchmark-'))
+    try:
+        paths_data, icon_names, layout = create_tree(
+            path=path,
+            applications=applications,
+            folders=max(1, applications // arguments.apps_per_folder),
+            data_dirs=arguments.data_dirs)
+        with open(path / 'layout.json', 'w') as file:
+            json.dump(layout, file)
+        with open(path / 'icons.json', 'w') as file:
+            json.dump(icon_names, file)
+        results = {}
+        # The time and the peak memory are measured in separate processes
+        for run, trace_memory in enumerate((False, True)):
+            environment = dict(os.environ,
+                               GSETTINGS_BACKEND='memory',
+                               NO_AT_BRIDGE='1',
+                               XDG_DATA_HOME=str(paths_data[0]),
+                               XDG_DATA_DIRS=os.pathsep.join(
+                                   [*map(str, paths_data[1:]),
+                                    os.environ.get('XDG_DATA_DIRS',
+                                                   DEFAULT_DATA_DIRS)]),
+                               XDG_CONFIG_HOME=str(path / f'config{run}'),
+                               XDG_CACHE_HOME=str(path / f'cache{run}'))
+            command = [sys.executable, __file__, '--run', str(path)]
+            if trace_memory:
+                command.append('--trace-memory')
+            if 'DISPLAY' not in os.environ and not arguments.no_xvfb:
+                if not shutil.which('xvfb-run'):
+                    sys.exit('xvfb-run not found, set DISPLAY or use '
+                             '--no-xvfb')
+                command = ['xvfb-run', '--auto-servernum'] + command
+            process = subprocess.run(command,
+                                     cwd=PATH_REPOSITORY,
+                                     env=environment,
+                                     stdout=subprocess.PIPE,
+                                     universal_newlines=True,
+                                     check=True)
+            for operation, values in json.loads(
+                    process.stdout.splitlines()[-1]).items():
+                results.setdefault(operation, {}).update(values)
+        return results
+    finally:
+        shutil.rmtree(path)
+
+
+def compare(results, baseline, tolerance):
+    """Return the operations slower or bigger than the baseline"""
+    regressions = []
+    for size, operations in results.items():
+        for operation, values in operations.items():
+            previous = baseline.get(size, {}).get(operation)
+            if not previous:
+                continue
+            for key in ('time', 'peak'):
+                if values[key] > previous[key] * (1 + tolerance):
+                    regressions.append(
+                        f'{operation} ({size} applications): {key} '
+                        f'{values[key]:.4g} > {previous[key]:.4g}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measure the operations on synthetic XDG data')
+    parser.add_argument('--sizes',
+                        default=DEFAULT_SIZES,
+                        help='comma separated numbers of desktop files '
+                             f'(default: {DEFAULT_SIZES})')
+    parser.add_argument('--apps-per-folder',
+                        type=int,
+                        default=20,
+                        help='desktop files for each folder (default: 20)')
+    parser.add_argument('--data-dirs',
+                        type=int,
+                        default=3,
+                        help='number of XDG data directories (default: 3)')
+    parser.add_argument('--baseline',
+                        type=pathlib.Path,
+                        default=FILE_BASELINE,
+                        help='baseline results file')
+    parser.add_argument('--save-baseline',
+                        action='store_true',
+                        help='save the results as the new baseline')
+    parser.add_argument('--tolerance',
+                        type=float,
+                        default=0.25,
+                        help='allowed increase over the baseline '
+                             '(default: 0.25)')
+    parser.add_argument('--no-xvfb',
+                        action='store_true',
+                        help='do not start Xvfb when DISPLAY is not set')
+    parser.add_argument('--run',
+                        type=pathlib.Path,
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--trace-memory',
+                        action='store_true',
+                        help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+    if arguments.run:
+        # Execute the operations inside the prepared environment
+        print(json.dumps(run_operations(path=arguments.run,
+                                        trace_memory=arguments.trace_memory)))
+        return 0
+    results = {}
+    for size in map(int, arguments.sizes.split(',')):
+        results[str(size)] = run_size(arguments, size)
+        for operation, values in results[str(size)].items():
+            print(f'{size:>7} {operation:<25} '
+                  f'{values["time"] * 1000:>10.1f} ms '
+                  f'{values["peak"] / 1024:>10.0f} KiB')
+    if arguments.save_baseline:
+        with open(arguments.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f'Baseline saved to {arguments.baseline}')
+    elif arguments.baseline.is_file():
+        with open(arguments.baseline, 'r') as file:
+            regressions = compare(results=results,
+                                  baseline=json.load(file),
+                                  tolerance=arguments.tolerance)
+        for regression in regressions:
+            print(f'Regression: {regression}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -19,8 +19,10 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 ##
 
+import sys
+
 import gnome_appfolders_manager.main
 
 
 if __name__ == '__main__':
-    gnome_appfolders_manager.main.main()
+    sys.exit(gnome_appfolders_manager.main.main())
@@ -0,0 +1,252 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import json
+import logging
+import sys
+
+from gi.repository import Gio
+
+from gnome_appfolders_manager.models.category_index import (
+    get_category_index)
+from gnome_appfolders_manager.models.desktop_index import get_desktop_index
+from gnome_appfolders_manager.models.folder_info import (
+    OPTION_FOLDER_APPS,
+    OPTION_FOLDER_EXCLUDED_APPS,
+    FolderInfo)
+from gnome_appfolders_manager.models.folder_rules import (FolderRulesEngine,
+                                                          FolderRulesError)
+from gnome_appfolders_manager.models.folders_index import FoldersIndex
+from gnome_appfolders_manager.models.folders_layout import (
+    FoldersLayout,
+    FoldersLayoutError)
+from gnome_appfolders_manager.models.folders_list import FoldersList
+from gnome_appfolders_manager.models.folders_report import FoldersReport
+from gnome_appfolders_manager.models.settings_transaction import (
+    settings_transaction)
+
+# This module is used without a display and must never import Gtk
+
+
+class CommandLine(object):
+    def __init__(self, options):
+        """Execute a command from the command line without the UI"""
+        self.options = options
+        self.folders_list = FoldersList()
+
+    def run(self):
+        """Execute the command and return the exit status"""
+        method = getattr(self, f'do_{self.options.command.replace("-", "_")}')
+        try:
+            result = method()
+        except CommandLineError as error:
+            logging.error(str(error))
+            result = 1
+        # Write any pending change before exiting
+        Gio.Settings.sync()
+        return result or 0
+
+    def get_folder(self, folder):
+        """Return the FolderInfo for an existing folder"""
+        if folder not in self.folders_list.get_folders():
+            raise CommandLineError(f'Folder not found: {folder}')
+        return FolderInfo(folder)
+
+    def do_list(self):
+        """Print the folders names and titles"""
+        for folder in self.folders_list.get_folders():
+            folder_info = FolderInfo(folder)
+            print(f'{folder}\t{folder_info.get_name()}')
+
+    def do_show(self):
+        """Print the details of a folder"""
+        folder_info = self.get_folder(self.options.folder)
+        print(f'name: {folder_info.folder}')
+        print(f'title: {folder_info.get_name()}')
+        print(f'translate: {str(folder_info.translate).lower()}')
+        print(f'categories: {";".join(folder_info.categories)}')
+        print(f'excluded-apps: {";".join(folder_info.excluded_apps)}')
+        # Show the applications included by GNOME Shell with their origin
+        desktop_index = get_desktop_index()
+        print('apps:')
+        for application, category in (
+                folder_info.get_effective_applications().items()):
+            desktop_file = desktop_index.get_entry(application)
+            print(f'  {application}\t'
+                  f'{desktop_file.name if desktop_file else "(missing)"}\t'
+                  f'{category or "apps"}')
+
+    def do_add_app(self):
+        """Add some applications to a folder"""
+        folder_info = self.get_folder(self.options.folder)
+        applications = list(folder_info.apps)
+        for application in self.options.applications:
+            if application not in applications:
+                applications.append(application)
+        options = {OPTION_FOLDER_APPS: applications}
+        if folder_info.has_option(OPTION_FOLDER_EXCLUDED_APPS):
+            # The excluded applications are hidden also if listed in apps
+            options[OPTION_FOLDER_EXCLUDED_APPS] = [
+                application for application in folder_info.excluded_apps
+                if application not in self.options.applications]
+        folder_info.set_options(options)
+
+    def do_remove_app(self):
+        """Remove some applications from a folder"""
+        folder_info = self.get_folder(self.options.folder)
+        options = {OPTION_FOLDER_APPS: [
+            application for application in folder_info.apps
+            if application not in self.options.applications]}
+        if folder_info.has_option(OPTION_FOLDER_EXCLUDED_APPS):
+            # Exclude the applications included by the categories
+            excluded = list(folder_info.excluded_apps)
+            matching = folder_info.get_category_applications()
+            for application in self.options.applications:
+                if application in matching and application not in excluded:
+                    excluded.append(application)
+            options[OPTION_FOLDER_EXCLUDED_APPS] = excluded
+        folder_info.set_options(options)
+
+    def do_create(self):
+        """Create a new folder"""
+        folder = self.options.folder
+        if folder in self.folders_list.get_folders():
+            raise CommandLineError(f'Folder already exists: {folder}')
+        folder_info = FolderInfo(folder)
+        with settings_transaction(folder_info.settings,
+                                  self.folders_list.settings):
+            folder_info.set_title(self.options.title or folder)
+            self.folders_list.add_folder(folder)
+
+    def do_delete(self):
+        """Remove a folder"""
+        folder_info = self.get_folder(self.options.folder)
+        with settings_transaction(folder_info.settings,
+                                  self.folders_list.settings):
+            folder_info.remove()
+            self.folders_list.remove_folder(folder_info.folder)
+
+    def do_export(self):
+        """Write the folders layout to a JSON file"""
+        layout = FoldersLayout(folders_list=self.folders_list).export()
+        if self.options.filename == '-':
+            json.dump(layout, sys.stdout, indent=2)
+            sys.stdout.write('\n')
+        else:
+            with open(self.options.filename, 'w') as file:
+                json.dump(layout, file, indent=2)
+                file.write('\n')
+
+    def do_import(self):
+        """Apply the folders layout from a JSON file"""
+        try:
+            if self.options.filename == '-':
+                layout = json.load(sys.stdin)
+            else:
+                with open(self.options.filename, 'r') as file:
+                    layout = json.load(file)
+        except (OSError, ValueError) as error:
+            raise CommandLineError(f'Unable to read the layout: {error}')
+        folders_layout = FoldersLayout(folders_list=self.folders_list)
+        try:
+            removed, changes, children = folders_layout.get_changes(
+                layout=layout,
+                remove_missing=not self.options.keep_missing)
+        except FoldersLayoutError as error:
+            raise CommandLineError(str(error))
+        for folder in removed:
+            print(f'remove {folder}')
+        for folder, options in changes.items():
+            print(f'update {folder}: {", ".join(options)}')
+        if children is not None:
+            print('update folders list')
+        if not self.options.dry_run:
+            folders_layout.apply(removed=removed,
+                                 changes=changes,
+                                 children=children)
+
+    def do_assign(self):
+        """Propose or apply the folders applications from the rules"""
+        category_index = get_category_index()
+        category_index.refresh()
+        engine = FolderRulesEngine(category_index=category_index)
+        folders = self.folders_list.get_folders()
+        try:
+            with open(self.options.rules, 'r') as file:
+                rules = engine.load_rules(json.load(file))
+        except (OSError, ValueError) as error:
+            raise CommandLineError(f'Unable to read the rules: {error}')
+        except FolderRulesError as error:
+            raise CommandLineError(str(error))
+        for rule in rules:
+            if rule.folder not in folders:
+                raise CommandLineError(f'Folder not found: {rule.folder}')
+        proposals = engine.propose(rules)
+        for folder, (added, removed) in proposals.items():
+            for application in added:
+                print(f'{folder}\t+{application}')
+            for application in removed:
+                print(f'{folder}\t-{application}')
+        if self.options.apply:
+            engine.apply(proposals)
+
+    def do_which(self):
+        """Print the folders containing some applications"""
+        folders_index = FoldersIndex()
+        for folder in self.folders_list.get_folders():
+            folder_info = FolderInfo(folder)
+            folders_index.set_folder(folder=folder,
+                                     title=folder_info.name,
+                                     applications=folder_info.apps)
+        result = 0
+        for application in self.options.applications:
+            folders = folders_index.get_folders(application)
+            if folders:
+                print(f'{application}\t{";".join(folders)}')
+            else:
+                # Like which, fail when any application was not found
+                result = 1
+        return result
+
+    def do_report(self):
+        """Print the duplicated applications and the folders conflicts"""
+        report = FoldersReport(folders_list=self.folders_list)
+        report.scan()
+        for application, folders in report.duplicates.items():
+            print(f'duplicate\t{application}\t{";".join(folders)}')
+        for folder, applications in report.redundant.items():
+            for application in applications:
+                print(f'redundant\t{application}\t{folder}')
+        for folder in report.unresolved:
+            print(f'unresolved\t{report.folders[folder].name}\t{folder}')
+        for application, folders in report.unfixable.items():
+            print(f'unfixable\t{application}\t{";".join(folders)}')
+        if self.options.fix:
+            report.apply(report.get_fixes())
+            # Fail when any issue cannot be fixed
+            if report.unfixable:
+                return 1
+        elif report.has_issues():
+            # Fail when any issue was found and not fixed
+            return 1
+
+
+class CommandLineError(Exception):
+    pass
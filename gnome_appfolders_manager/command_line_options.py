@@ -49,6 +49,83 @@ class CommandLineOptions(object):
                                  action='store_const',
                                  const=VERBOSE_LEVEL_QUIET,
                                  help='hide error and information messages')
+        self.parser.add_argument('--profile-trace',
+                                 metavar='FILE',
+                                 help='write the timing spans to a Chrome '
+                                      'trace JSON file on exit')
+        self.parser.add_argument('--profile-cpu',
+                                 metavar='FILE',
+                                 help='profile the application with cProfile '
+                                      'and write the .pstats file on exit')
+        self.parser.add_argument('--profile-memory',
+                                 metavar='FILE',
+                                 help='trace the memory allocations and '
+                                      'write the top allocations on exit')
+        # Commands executed without the user interface
+        self.commands = self.parser.add_subparsers(dest='command',
+                                                   metavar='COMMAND')
+        self.add_command('list',
+                         help='list the folders')
+        command = self.add_command('show',
+                                   help='show the details of a folder')
+        command.add_argument('folder')
+        command = self.add_command('add-app',
+                                   help='add applications to a folder')
+        command.add_argument('folder')
+        command.add_argument('applications',
+                             nargs='+',
+                             metavar='application')
+        command = self.add_command('remove-app',
+                                   help='remove applications from a folder')
+        command.add_argument('folder')
+        command.add_argument('applications',
+                             nargs='+',
+                             metavar='application')
+        command = self.add_command('create',
+                                   help='create a new folder')
+        command.add_argument('folder')
+        command.add_argument('-t', '--title',
+                             help='title for the new folder')
+        command = self.add_command('delete',
+                                   help='delete a folder')
+        command.add_argument('folder')
+        command = self.add_command('export',
+                                   help='export the folders layout')
+        command.add_argument('filename',
+                             nargs='?',
+                             default='-',
+                             help='JSON file to write (default: stdout)')
+        command = self.add_command('import',
+                                   help='import a folders layout')
+        command.add_argument('filename',
+                             help='JSON file to read (- for stdin)')
+        command.add_argument('-k', '--keep-missing',
+                             action='store_true',
+                             help='keep the folders missing in the layout')
+        command.add_argument('-n', '--dry-run',
+                             action='store_true',
+                             help='show the changes without applying them')
+        command = self.add_command('assign',
+                                   help='assign the applications to the '
+                                        'folders using rules')
+        command.add_argument('-r', '--rules',
+                             required=True,
+                             help='JSON rules file')
+        command.add_argument('-a', '--apply',
+                             action='store_true',
+                             help='apply the proposed changes')
+        command = self.add_command('which',
+                                   help='show the folders containing some '
+                                        'applications')
+        command.add_argument('applications',
+                             nargs='+',
+                             metavar='application')
+        command = self.add_command('report',
+                                   help='report the duplicated applications '
+                                        'and the folders conflicts')
+        command.add_argument('-f', '--fix',
+                             action='store_true',
+                             help='fix the reported issues')
         self.options = None
 
     # noinspection PyProtectedMember,PyUnresolvedReferences
@@ -61,6 +138,16 @@ class CommandLineOptions(object):
         """
         return self.parser.add_argument_group(name)
 
+    def add_command(self, name: str, help: str) -> argparse.ArgumentParser:
+        """
+        Add a command to execute without the user interface
+
+        :param name: name for the new command
+        :param help: description for the new command
+        :return: ArgumentParser object with the new command arguments
+        """
+        return self.commands.add_parser(name, help=help)
+
     def parse_options(self) -> argparse.Namespace:
         """
         Parse command-line options
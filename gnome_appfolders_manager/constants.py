@@ -18,6 +18,7 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 ##
 
+import functools
 import pathlib
 import sys
 
@@ -44,49 +45,97 @@ VERBOSE_LEVEL_MAX = 2
 MISSING_ICON_NAME = 'application-x-executable'
 
 # Paths constants
-path_xdg_data_home = pathlib.Path(BaseDirectory.xdg_data_home)
-icon_name = f'{APP_DOMAIN}.png'
-if (pathlib.Path('data') / icon_name).is_file():
-    # Use relative paths
-    DIR_PREFIX = pathlib.Path('data').parent.absolute()
-    DIR_LOCALE = DIR_PREFIX / 'locale'
-    DIR_DOCS = DIR_PREFIX / 'doc'
-elif (path_xdg_data_home / APP_DOMAIN / 'data' / icon_name).is_file():
-    # Use local user path
-    DIR_PREFIX = path_xdg_data_home / APP_DOMAIN
-    DIR_LOCALE = path_xdg_data_home / 'locale'
-    DIR_DOCS = path_xdg_data_home / 'doc' / APP_DOMAIN
-elif (pathlib.Path(__file__).parent.parent / 'share' / APP_DOMAIN / 'data' /
-      icon_name).is_file():
-    # Use local user path in the local Python directory
-    DIR_PREFIX = pathlib.Path(__file__).parent.parent / 'share' / APP_DOMAIN
-    DIR_LOCALE = DIR_PREFIX.parent / 'locale'
-    DIR_DOCS = DIR_PREFIX.parent / 'doc' / APP_DOMAIN
-else:
-    # Use system path
-    path_prefix = pathlib.Path(sys.prefix)
-    DIR_PREFIX = path_prefix / 'share' / APP_DOMAIN
-    DIR_LOCALE = path_prefix / 'share' / 'locale'
-    DIR_DOCS = path_prefix / 'share' / 'doc' / APP_DOMAIN
-# Set the paths for the folders
-DIR_DATA = DIR_PREFIX / 'data'
-DIR_ICONS = DIR_DATA / 'icons'
-DIR_UI = DIR_PREFIX / 'ui'
-try:
-    # In read-only environments, the settings folder cannot be created
-    # (e.g. in a Debian pbuilder fakeroot)
-    DIR_SETTINGS = pathlib.Path(BaseDirectory.save_config_path(APP_DOMAIN))
-except PermissionError:
-    # Get the settings path without actually creating it
-    DIR_SETTINGS = pathlib.Path(BaseDirectory.xdg_config_home) / APP_DOMAIN
-# Set the paths for the data files
-FILE_ICON = DIR_DATA / icon_name
-FILE_CONTRIBUTORS = DIR_DOCS / 'contributors'
-FILE_TRANSLATORS = DIR_DOCS / 'translators'
-FILE_LICENSE = DIR_DOCS / 'license'
-FILE_RESOURCES = DIR_DOCS / 'resources'
-# Set the paths for configuration files
-FILE_SETTINGS = DIR_SETTINGS / 'settings.conf'
-# Settings schema and paths
+
+
+@functools.lru_cache(maxsize=None)
+def get_install_paths():
+    """Return the prefix, locale and documentation paths"""
+    path_xdg_data_home = pathlib.Path(BaseDirectory.xdg_data_home)
+    icon_name = f'{APP_DOMAIN}.png'
+    if (pathlib.Path('data') / icon_name).is_file():
+        # Use relative paths
+        path_prefix = pathlib.Path('data').parent.absolute()
+        return (path_prefix,
+                path_prefix / 'locale',
+                path_prefix / 'doc')
+    elif (path_xdg_data_home / APP_DOMAIN / 'data' / icon_name).is_file():
+        # Use local user path
+        return (path_xdg_data_home / APP_DOMAIN,
+                path_xdg_data_home / 'locale',
+                path_xdg_data_home / 'doc' / APP_DOMAIN)
+    elif (pathlib.Path(__file__).parent.parent / 'share' / APP_DOMAIN /
+          'data' / icon_name).is_file():
+        # Use local user path in the local Python directory
+        path_prefix = (pathlib.Path(__file__).parent.parent / 'share' /
+                       APP_DOMAIN)
+        return (path_prefix,
+                path_prefix.parent / 'locale',
+                path_prefix.parent / 'doc' / APP_DOMAIN)
+    else:
+        # Use system path
+        path_prefix = pathlib.Path(sys.prefix)
+        return (path_prefix / 'share' / APP_DOMAIN,
+                path_prefix / 'share' / 'locale',
+                path_prefix / 'share' / 'doc' / APP_DOMAIN)
+
+
+def get_settings_path():
+    """Return the settings path, creating it if possible"""
+    try:
+        # In read-only environments, the settings folder cannot be created
+        # (e.g. in a Debian pbuilder fakeroot)
+        return pathlib.Path(BaseDirectory.save_config_path(APP_DOMAIN))
+    except PermissionError:
+        # Get the settings path without actually creating it
+        return pathlib.Path(BaseDirectory.xdg_config_home) / APP_DOMAIN
+
+
+def get_cache_path():
+    """Return the cache path, creating it if possible"""
+    try:
+        # In read-only environments, the cache folder cannot be created
+        return pathlib.Path(BaseDirectory.save_cache_path(APP_DOMAIN))
+    except PermissionError:
+        # Get the cache path without actually creating it
+        return pathlib.Path(BaseDirectory.xdg_cache_home) / APP_DOMAIN
+
+
+# Paths resolved only on their first access, as probing the installation
+# paths and creating the settings folders slows down the startup
+LAZY_CONSTANTS = {
+    'DIR_PREFIX': lambda: get_install_paths()[0],
+    'DIR_LOCALE': lambda: get_install_paths()[1],
+    'DIR_DOCS': lambda: get_install_paths()[2],
+    'DIR_DATA': lambda: __getattr__('DIR_PREFIX') / 'data',
+    'DIR_ICONS': lambda: __getattr__('DIR_DATA') / 'icons',
+    'DIR_UI': lambda: __getattr__('DIR_PREFIX') / 'ui',
+    'DIR_SETTINGS': get_settings_path,
+    'DIR_CACHE': get_cache_path,
+    'FILE_ICON': lambda: __getattr__('DIR_DATA') / f'{APP_DOMAIN}.png',
+    'FILE_CONTRIBUTORS': lambda: __getattr__('DIR_DOCS') / 'contributors',
+    'FILE_TRANSLATORS': lambda: __getattr__('DIR_DOCS') / 'translators',
+    'FILE_LICENSE': lambda: __getattr__('DIR_DOCS') / 'license',
+    'FILE_RESOURCES': lambda: __getattr__('DIR_DOCS') / 'resources',
+    'FILE_SETTINGS': lambda: __getattr__('DIR_SETTINGS') / 'settings.conf',
+    'FILE_DESKTOP_INDEX': lambda: (__getattr__('DIR_CACHE') /
+                                   'desktop-index.json'),
+}
+
+
+def __getattr__(name):
+    """Resolve a lazy constant on its first access"""
+    if name not in LAZY_CONSTANTS:
+        raise AttributeError(f'module {__name__} has no attribute {name}')
+    if name not in globals():
+        # Replace the lazy constant with its value for the next accesses
+        globals()[name] = LAZY_CONSTANTS[name]()
+    return globals()[name]
+
+
 SCHEMA_FOLDERS = 'org.gnome.desktop.app-folders'
 SCHEMA_FOLDER = f'{SCHEMA_FOLDERS}.folder'
+
+if sys.version_info < (3, 7):
+    # Module __getattr__ is not supported, resolve every path immediately
+    for name in LAZY_CONSTANTS:
+        __getattr__(name)
@@ -18,59 +18,155 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 ##
 
-import itertools
 import logging
 import pathlib
 
 from gi.repository import GdkPixbuf
+from gi.repository import Gio
+from gi.repository import GLib
 from gi.repository import Gtk
 
 from gnome_appfolders_manager.constants import DIR_UI
+from gnome_appfolders_manager.icon_files_index import icon_files_index
+from gnome_appfolders_manager.pixbuf_cache import pixbuf_cache
+from gnome_appfolders_manager.profiling import trace_span
 
 
-def get_pixbuf_from_icon_name(icon_name, size):
-    """Get a Gdk.PixBuf from a theme icon"""
+@trace_span
+def get_pixbuf_from_icon_name(icon_name, size, scale=1):
+    """Get a Gdk.PixBuf from a theme icon, using the pixbuf cache"""
+    key = pixbuf_cache.get_key(icon_name, size, scale)
+    # Skip the icons already known to be missing
+    if pixbuf_cache.is_missing(key):
+        return None
+    icon = pixbuf_cache.get(key)
+    if icon is None:
+        icon = load_pixbuf_from_icon_name(icon_name, size, scale)
+        if icon:
+            pixbuf_cache.add(key, icon)
+        else:
+            pixbuf_cache.add_missing(key)
+    return icon
+
+
+def get_pixbuf_from_cache(icon_name, size, scale=1):
+    """Get a Gdk.PixBuf from the pixbuf cache without loading it"""
+    return pixbuf_cache.peek(pixbuf_cache.get_key(icon_name, size, scale))
+
+
+def load_pixbuf_from_icon_name(icon_name, size, scale):
+    """Load a Gdk.PixBuf from a theme icon"""
     theme = Gtk.IconTheme.get_default()
     path_icon_name = pathlib.Path(icon_name)
     if theme.has_icon(icon_name):
         # The icon was a theme icon
-        icon = theme.load_icon(icon_name=icon_name,
-                               size=size,
-                               flags=Gtk.IconLookupFlags.USE_BUILTIN)
+        icon = theme.load_icon_for_scale(icon_name=icon_name,
+                                         size=size,
+                                         scale=scale,
+                                         flags=Gtk.IconLookupFlags.USE_BUILTIN)
     elif theme.has_icon(path_icon_name.stem):
         # The theme contains an icon with the same file name
-        icon = theme.load_icon(icon_name=path_icon_name.stem,
-                               size=size,
-                               flags=Gtk.IconLookupFlags.USE_BUILTIN)
+        icon = theme.load_icon_for_scale(icon_name=path_icon_name.stem,
+                                         size=size,
+                                         scale=scale,
+                                         flags=Gtk.IconLookupFlags.USE_BUILTIN)
     elif path_icon_name.is_file():
         # The icon was a full filename
         icon = GdkPixbuf.Pixbuf.new_from_file(icon_name)
     else:
         # The icon was not found in the current theme, search for filenames
-        # with png or jpg extensions
-        if path_icon_name.suffix.lower() in ('.png', '.jpg', '.xpm', '.svg'):
-            filenames = (icon_name, )
-        else:
-            filenames = (f'{icon_name}.png',
-                         f'{icon_name}.jpg',
-                         f'{icon_name}.xpm',
-                         f'{icon_name}.svg')
-        # Search for filenames in icons and pixmaps directories
-        icon = None
-        search_in_paths = ('/usr/share/icons',
-                           '/usr/share/pixmaps')
-        for path, filename in itertools.product(search_in_paths, filenames):
-            file_path = pathlib.Path(path) / filename
-            if file_path.is_file():
-                icon = GdkPixbuf.Pixbuf.new_from_file(str(file_path))
-                break
+        # with image extensions in icons and pixmaps directories
+        file_path = icon_files_index.find(icon_name)
+        icon = (GdkPixbuf.Pixbuf.new_from_file(file_path)
+                if file_path else None)
     if icon:
-        # If size is not correct then resize the icon to the requested size
-        if icon.get_width() != size or icon.get_height() != size:
-            icon = icon.scale_simple(size, size,
-                                     GdkPixbuf.InterpType.BILINEAR)
+        icon = resize_pixbuf(icon, size * scale)
+    else:
+        logging.warning(f'missing icon: {icon_name}')
+    return icon
+
+
+def get_pixbuf_from_icon_name_async(icon_name, size, cancellable, callback,
+                                    scale=1):
+    """Get a Gdk.PixBuf from a theme icon without blocking the main loop,
+    the callback is called with the icon or None unless it was cancelled"""
+    key = pixbuf_cache.get_key(icon_name, size, scale)
+    if pixbuf_cache.is_missing(key):
+        callback(None)
+        return
+    icon = pixbuf_cache.get(key)
+    if icon is not None:
+        callback(icon)
+        return
+
+    def on_loaded(loader, result):
+        """Complete the icon loading and cache the result"""
+        try:
+            icon = loader(result)
+        except GLib.Error as error:
+            if error.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                return
+            icon = None
+        if icon:
+            icon = resize_pixbuf(icon, size * scale)
+            pixbuf_cache.add(key, icon)
+        else:
+            logging.warning(f'missing icon: {icon_name}')
+            pixbuf_cache.add_missing(key)
+        callback(icon)
+
+    def on_file_read(file, result):
+        """Decode the icon from the opened file stream"""
+        try:
+            stream = file.read_finish(result)
+        except GLib.Error as error:
+            if error.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                return
+            pixbuf_cache.add_missing(key)
+            callback(None)
+            return
+        GdkPixbuf.Pixbuf.new_from_stream_async(
+            stream,
+            cancellable,
+            lambda source, result: on_loaded(
+                GdkPixbuf.Pixbuf.new_from_stream_finish, result))
+
+    theme = Gtk.IconTheme.get_default()
+    path_icon_name = pathlib.Path(icon_name)
+    for theme_icon_name in (icon_name, path_icon_name.stem):
+        icon_info = theme.lookup_icon_for_scale(
+            icon_name=theme_icon_name,
+            size=size,
+            scale=scale,
+            flags=Gtk.IconLookupFlags.USE_BUILTIN)
+        if icon_info:
+            # The icon was a theme icon or the theme contains an icon with
+            # the same file name
+            icon_info.load_icon_async(
+                cancellable,
+                lambda source, result: on_loaded(source.load_icon_finish,
+                                                 result))
+            return
+    # The icon was a full filename or was not found in the current theme,
+    # search for filenames with image extensions in icons and pixmaps
+    # directories
+    file_path = (icon_name if path_icon_name.is_file()
+                 else icon_files_index.find(icon_name))
+    if file_path:
+        Gio.File.new_for_path(file_path).read_async(GLib.PRIORITY_DEFAULT,
+                                                    cancellable,
+                                                    on_file_read)
     else:
         logging.warning(f'missing icon: {icon_name}')
+        pixbuf_cache.add_missing(key)
+        callback(None)
+
+
+def resize_pixbuf(icon, size):
+    """If size is not correct then resize the icon to the requested size"""
+    if icon.get_width() != size or icon.get_height() != size:
+        icon = icon.scale_simple(size, size,
+                                 GdkPixbuf.InterpType.BILINEAR)
     return icon
 
 
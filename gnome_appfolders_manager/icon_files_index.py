@@ -0,0 +1,71 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import logging
+import os
+
+ICON_EXTENSIONS = ('.png', '.jpg', '.xpm', '.svg')
+
+
+class IconFilesIndex(object):
+    def __init__(self, directories):
+        """Index the icon files found in the fallback directories"""
+        self.directories = directories
+        self.files = None
+
+    def scan(self):
+        """List the fallback directories once"""
+        logging.debug('Indexing the fallback icons directories')
+        self.files = {}
+        for directory in self.directories:
+            self.files[directory] = set()
+            try:
+                with os.scandir(directory) as iterator:
+                    for item in iterator:
+                        if item.is_file():
+                            self.files[directory].add(item.name)
+            except OSError:
+                pass
+
+    def find(self, icon_name):
+        """Return the path for an icon name with or without extension"""
+        if self.files is None:
+            self.scan()
+        if os.path.splitext(icon_name)[1].lower() in ICON_EXTENSIONS:
+            filenames = (icon_name, )
+        else:
+            filenames = [f'{icon_name}{extension}'
+                         for extension in ICON_EXTENSIONS]
+        # Follow the directories order before the extensions order
+        for directory in self.directories:
+            for filename in filenames:
+                if os.sep in filename:
+                    # Only the top level files are indexed, check the
+                    # relative paths in subdirectories
+                    found = os.path.isfile(os.path.join(directory, filename))
+                else:
+                    found = filename in self.files[directory]
+                if found:
+                    return os.path.join(directory, filename)
+        return None
+
+
+icon_files_index = IconFilesIndex(directories=('/usr/share/icons',
+                                               '/usr/share/pixmaps'))
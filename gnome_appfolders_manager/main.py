@@ -20,16 +20,10 @@
 
 import logging
 
-import gnome_appfolders_manager.requires                           # noqa: F401
-from gnome_appfolders_manager.app import Application
 from gnome_appfolders_manager.command_line_options import CommandLineOptions
-from gnome_appfolders_manager.constants import (DIR_DATA,
-                                                DIR_DOCS,
-                                                DIR_LOCALE,
-                                                DIR_PREFIX,
-                                                DIR_SETTINGS,
-                                                DIR_UI)
-import gnome_appfolders_manager.translations                       # noqa: F401
+import gnome_appfolders_manager.constants as constants
+from gnome_appfolders_manager.profiling import (session_profiler,
+                                                trace_recorder)
 
 
 def main():
@@ -47,14 +41,37 @@ def main():
                                '%(funcName)-30s '
                                'pid: %(process)-9d '
                                '%(message)s')
-    # Log paths for debug purposes
-    # Not using {VARIABLE=} as it's not compatible with Python 3.6
-    logging.debug(f'DIR_PREFIX={str(DIR_PREFIX)}')
-    logging.debug(f'DIR_LOCALE={str(DIR_LOCALE)}')
-    logging.debug(f'DIR_DOCS={str(DIR_DOCS)}')
-    logging.debug(f'DIR_DATA={str(DIR_DATA)}')
-    logging.debug(f'DIR_UI={str(DIR_UI)}')
-    logging.debug(f'DIR_SETTINGS={str(DIR_SETTINGS)}')
-    # Start the application
-    app = Application(options=options)
-    app.run(None)
+    # Log paths for debug purposes, resolving them only when needed
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        for name in ('DIR_PREFIX', 'DIR_LOCALE', 'DIR_DOCS', 'DIR_DATA',
+                     'DIR_UI', 'DIR_SETTINGS'):
+            logging.debug(f'{name}={str(getattr(constants, name))}')
+    if options.profile_trace:
+        # The traced functions are wrapped only when enabled before their
+        # modules are imported
+        trace_recorder.enable()
+    try:
+        if options.command:
+            # Execute the command without importing Gtk
+            session_profiler.start(cpu=bool(options.profile_cpu),
+                                   memory=bool(options.profile_memory))
+            try:
+                from gnome_appfolders_manager.cli import CommandLine
+                return CommandLine(options=options).run()
+            finally:
+                session_profiler.save(
+                    cpu_filename=options.profile_cpu,
+                    memory_filename=options.profile_memory)
+        import gnome_appfolders_manager.requires                   # noqa: F401
+        # Profile the whole application, including its modules imports
+        session_profiler.start(cpu=bool(options.profile_cpu),
+                               memory=bool(options.profile_memory))
+        from gnome_appfolders_manager.translations import load_translations
+        load_translations()
+        from gnome_appfolders_manager.app import Application
+        # Start the application
+        app = Application(options=options)
+        return app.run(None)
+    finally:
+        if options.profile_trace:
+            trace_recorder.save(options.profile_trace)
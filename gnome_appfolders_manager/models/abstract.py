@@ -18,6 +18,11 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 ##
 
+from gi.repository import Gtk
+
+from gnome_appfolders_manager.profiling import trace_span
+
+
 class ModelAbstract(object):
     COL_KEY = 0
 
@@ -25,6 +30,8 @@ class ModelAbstract(object):
         self.model = model
         # Fill the rows' dictionary with the model items
         self.rows = {}
+        # Sort column and order while the sorting is suspended
+        self.suspended_sorting = None
         for row in self.model:
             name = row[self.COL_KEY]
             self.rows[name] = self.model.get_iter(row.path)
@@ -42,8 +49,75 @@ class ModelAbstract(object):
         self.rows.clear()
         return self.model.clear()
 
+    @trace_span
     def add_data(self, item):
         """Add a new row to the model if it doesn't exist"""
+        key, values = self.get_row_data(item)
+        if key not in self.rows:
+            new_row = self.model.append(values)
+            self.rows[key] = new_row
+            self.on_row_added(item, new_row)
+            return new_row
+
+    def suspend_sorting(self):
+        """Disable the model sorting until resume_sorting is called"""
+        if self.suspended_sorting is None:
+            self.suspended_sorting = self.model.get_sort_column_id()
+            sort_column, sort_order = self.suspended_sorting
+            if sort_column is not None and sort_column >= 0:
+                self.model.set_sort_column_id(
+                    Gtk.TREE_SORTABLE_UNSORTED_SORT_COLUMN_ID, sort_order)
+
+    def resume_sorting(self):
+        """Restore the model sorting disabled by suspend_sorting"""
+        if self.suspended_sorting is not None:
+            sort_column, sort_order = self.suspended_sorting
+            self.suspended_sorting = None
+            if sort_column is not None and sort_column >= 0:
+                self.model.set_sort_column_id(sort_column, sort_order)
+
+    @trace_span
+    def add_many(self, items, treeview=None):
+        """Add many new rows at once, with the model sorting disabled and
+        the optional treeview detached from its model while inserting"""
+        rows = {}
+        for item in items:
+            key, values = self.get_row_data(item)
+            if key not in self.rows and key not in rows:
+                rows[key] = (values, item)
+        if not rows:
+            return []
+        # Sort the model only once after inserting, unless the sorting was
+        # already suspended for several calls
+        resume = self.suspended_sorting is None
+        self.suspend_sorting()
+        view_model = None
+        if treeview:
+            view_model = treeview.get_model()
+            treeview.set_model(None)
+        new_rows = {key: self.model.append(values)
+                    for key, (values, item) in rows.items()}
+        self.rows.update(new_rows)
+        # Restore the sorting and the treeview model
+        if resume:
+            self.resume_sorting()
+        if treeview:
+            treeview.set_model(view_model)
+        for key, (values, item) in rows.items():
+            self.on_row_added(item, new_rows[key])
+        return list(new_rows.values())
+
+    def replace_all(self, items, treeview=None):
+        """Replace every row in the model with new rows"""
+        self.clear()
+        return self.add_many(items=items, treeview=treeview)
+
+    def get_row_data(self, item):
+        """Return the key and the row values for an item"""
+        pass
+
+    def on_row_added(self, item, treeiter):
+        """Complete the addition of a new row"""
         pass
 
     def get_data(self, treeiter, column):
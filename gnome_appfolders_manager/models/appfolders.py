@@ -28,21 +28,59 @@ class ModelAppFolders(ModelAbstract):
     COL_DESCRIPTION = 3
     COL_ICON = 4
 
-    def add_data(self, item):
-        """Add a new row to the model if it doesn't exist"""
-        super(self.__class__, self).add_data(item)
-        if item.name not in self.rows:
-            new_row = self.model.append((
-                item.name,
-                item.title,
-                item.filename,
-                f'<b>{item.title}</b>\n'
+    def __init__(self, model):
+        super(self.__class__, self).__init__(model)
+        self.items = {}
+
+    def get_row_data(self, item):
+        """Return the key and the row values for an item"""
+        return item.name, (
+            item.name,
+            item.title,
+            item.filename,
+            self.get_description(item),
+            self.get_icon(item))
+
+    def on_row_added(self, item, treeiter):
+        """Complete the addition of a new row"""
+        self.items[item.name] = item
+
+    def update_data(self, item):
+        """Update only the changed values of an existing row"""
+        treeiter = self.get_iter(item.name)
+        if treeiter:
+            previous = self.items[item.name]
+            if (item.title != previous.title or
+                    item.filename != previous.filename):
+                self.set_data(treeiter, self.COL_TITLE, item.title)
+                self.set_data(treeiter, self.COL_FILENAME, item.filename)
+                self.set_data(treeiter, self.COL_DESCRIPTION,
+                              self.get_description(item))
+            if item.icon_name != previous.icon_name:
+                self.set_data(treeiter, self.COL_ICON, self.get_icon(item))
+            self.items[item.name] = item
+        return treeiter
+
+    def remove(self, treeiter):
+        """Remove a TreeIter"""
+        self.items.pop(self.get_key(treeiter), None)
+        super(self.__class__, self).remove(treeiter)
+
+    def clear(self):
+        """Clear the model"""
+        self.items.clear()
+        return super(self.__class__, self).clear()
+
+    def get_description(self, item):
+        """Return the description markup for an item"""
+        return (f'<b>{item.title}</b>\n'
                 f'<small>{item.name}\n'
-                f'{item.filename}</small>',
-                get_pixbuf_from_icon_name(item.icon_name, 48)
-                if item.icon_name else None))
-            self.rows[item.name] = new_row
-            return new_row
+                f'{item.filename}</small>')
+
+    def get_icon(self, item):
+        """Return the icon for an item"""
+        return (get_pixbuf_from_icon_name(item.icon_name, 48)
+                if item.icon_name else None)
 
     def get_title(self, treeiter):
         """Get the title from a TreeIter"""
@@ -20,11 +20,25 @@
 
 from gi.repository import GLib
 
+from gnome_appfolders_manager.localize import _
+
 
 class ApplicationInfo(object):
-    def __init__(self, filename, name, description, icon_name, valid):
+    def __init__(self, filename, name, description, icon_name, valid,
+                 category=None):
         self.filename = filename
         self.name = GLib.markup_escape_text(name)
         self.description = GLib.markup_escape_text(description)
         self.icon_name = icon_name
         self.valid = valid
+        # Category including the application in the folder, or None when
+        # the application is listed in the folder applications
+        self.category = category
+        self.markup = (f'<b>{self.name}</b>\n'
+                       f'<small>{self.description}</small>\n'
+                       f'<small>{GLib.markup_escape_text(filename)}</small>')
+        if category:
+            self.markup += '\n<small><i>{ORIGIN}</i></small>'.format(
+                ORIGIN=GLib.markup_escape_text(
+                    _('From the category {CATEGORY}').format(
+                        CATEGORY=category)))
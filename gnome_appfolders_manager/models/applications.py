@@ -18,10 +18,13 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 ##
 
-from gi.repository import GLib
+from gi.repository import Gio
 
 from gnome_appfolders_manager.constants import MISSING_ICON_NAME
-from gnome_appfolders_manager.functions import get_pixbuf_from_icon_name
+from gnome_appfolders_manager.functions import (
+    get_pixbuf_from_cache,
+    get_pixbuf_from_icon_name,
+    get_pixbuf_from_icon_name_async)
 from gnome_appfolders_manager.models.abstract import ModelAbstract
 
 
@@ -32,37 +35,97 @@ class ModelApplications(ModelAbstract):
     COL_ICON = 4
     COL_VALID = 5
     COL_VISIBLE = 6
+    # Search score used to sort the search results
+    COL_SCORE = 7
 
     def __init__(self, model):
         super(self.__class__, self).__init__(model)
         self.items = {}
+        # Cancellable used to stop loading the icons for removed rows
+        self.cancellable = Gio.Cancellable()
+        # Load the icons only for the rendered rows
+        self.lazy_icons = False
+        self.icons_requested = set()
 
-    def add_data(self, item):
-        """Add a new row to the model if it doesn't exist"""
-        super(self.__class__, self).add_data(item)
-        if item.filename not in self.rows:
-            icon = None
-            if item.icon_name:
-                icon = get_pixbuf_from_icon_name(item.icon_name, 48)
-            # Use a fallback icon if the icon was not found, or it was missing
-            if not icon:
-                icon = get_pixbuf_from_icon_name(MISSING_ICON_NAME, 48)
-            new_row = self.model.append((
-                item.filename,
-                item.name,
-                item.description,
-                '<b>{name}</b>\n'
-                '<small>{description}</small>\n'
-                '<small>{filename}</small>'.format(**{
-                    'name': item.name,
-                    'description': item.description,
-                    'filename': GLib.markup_escape_text(item.filename)}),
-                icon,
-                item.valid,
-                item.valid))
-            self.rows[item.filename] = new_row
+    def clear(self):
+        """Clear the model and stop loading the icons"""
+        self.cancellable.cancel()
+        self.cancellable = Gio.Cancellable()
+        self.icons_requested.clear()
+        return super(self.__class__, self).clear()
+
+    def set_lazy_icons(self, column, renderer):
+        """Load the icons only when their rows are rendered"""
+        self.lazy_icons = True
+        column.clear_attributes(renderer)
+        column.set_cell_data_func(renderer, self.on_cell_icon_data)
+
+    def get_row_data(self, item):
+        """Return the key and the row values for an item"""
+        # Use a fallback icon until the icon is loaded, or if it was missing
+        icon = (None if self.lazy_icons
+                else get_pixbuf_from_icon_name(MISSING_ICON_NAME, 48))
+        return item.filename, (
+            item.filename,
+            item.name,
+            item.description,
+            item.markup,
+            icon,
+            item.valid,
+            item.valid,
+            0.0)
+
+    def on_row_added(self, item, treeiter):
+        """Complete the addition of a new row"""
+        self.items[item.filename] = item
+        if item.icon_name and not self.lazy_icons:
+            self.load_icon(item)
+
+    def update_data(self, item):
+        """Update an existing row with new data"""
+        treeiter = self.get_iter(item.filename)
+        if treeiter:
             self.items[item.filename] = item
-            return new_row
+            for column, value in ((self.COL_TITLE, item.name),
+                                  (self.COL_COMMENT, item.description),
+                                  (self.COL_DESCRIPTION, item.markup),
+                                  (self.COL_VALID, item.valid),
+                                  (self.COL_VISIBLE, item.valid)):
+                self.set_data(treeiter, column, value)
+            if self.lazy_icons:
+                # Render the row again to request the new icon
+                self.icons_requested.discard(item.filename)
+                self.model.row_changed(self.model.get_path(treeiter),
+                                       treeiter)
+            else:
+                self.set_data(treeiter,
+                              self.COL_ICON,
+                              get_pixbuf_from_icon_name(MISSING_ICON_NAME,
+                                                        48))
+                if item.icon_name:
+                    self.load_icon(item)
+        return treeiter
+
+    def load_icon(self, item):
+        """Load the icon in background and update the row when ready"""
+        def on_icon_loaded(icon):
+            treeiter = self.rows.get(item.filename)
+            if icon and treeiter and not cancellable.is_cancelled():
+                if self.lazy_icons:
+                    # Render the row again using the cached icon, the icon
+                    # could be requested again after leaving the cache
+                    self.icons_requested.discard(item.filename)
+                    self.model.row_changed(self.model.get_path(treeiter),
+                                           treeiter)
+                else:
+                    self.model.set_value(treeiter, self.COL_ICON, icon)
+
+        cancellable = self.cancellable
+        self.icons_requested.add(item.filename)
+        get_pixbuf_from_icon_name_async(icon_name=item.icon_name,
+                                        size=48,
+                                        cancellable=cancellable,
+                                        callback=on_icon_loaded)
 
     def get_title(self, treeiter):
         """Get the title from a TreeIter"""
@@ -76,11 +139,17 @@ class ModelApplications(ModelAbstract):
         """Get the icon from a TreeIter"""
         return self.model[treeiter][self.COL_ICON]
 
-    def set_all_rows_visibility(self, visible):
-        """Set all items visible or restore the valid column for visibility"""
-        for treeiter in self.model:
-            self.model[treeiter.path][self.COL_VISIBLE] = (
-                # All rows are visible
-                True if visible
-                # Only valid rows are visible
-                else self.model[treeiter.path][self.COL_VALID])
+    def on_cell_icon_data(self, column, renderer, model, treeiter, data):
+        """Show the cached icon for a rendered row or request to load it"""
+        item = self.items.get(model[treeiter][self.COL_KEY])
+        icon = None
+        if item and item.icon_name:
+            icon = get_pixbuf_from_cache(icon_name=item.icon_name, size=48)
+            if icon is None and item.filename not in self.icons_requested:
+                self.load_icon(item)
+        if icon is None:
+            # Load the fallback icon only when not already cached
+            icon = (get_pixbuf_from_cache(icon_name=MISSING_ICON_NAME,
+                                          size=48) or
+                    get_pixbuf_from_icon_name(MISSING_ICON_NAME, 48))
+        renderer.props.pixbuf = icon
@@ -0,0 +1,124 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import logging
+
+from gi.repository import Gio
+
+from gnome_appfolders_manager.models.application_info import ApplicationInfo
+from gnome_appfolders_manager.models.search_index import SearchIndex
+
+
+class ApplicationsCatalog(object):
+    def __init__(self):
+        """Catalog of the installed applications shared by the pickers"""
+        self.items = {}
+        # Raw values used to detect the changed applications
+        self.signatures = {}
+        self.loaded = False
+        self.search_index = SearchIndex()
+        self.monitor = Gio.AppInfoMonitor.get()
+        self.monitor.connect('changed', self.on_monitor_changed)
+
+    def get_signature(self, desktop_entry):
+        """Return the raw values for a Gio.AppInfo"""
+        icon_name = None
+        icon = desktop_entry.get_icon()
+        if isinstance(icon, Gio.ThemedIcon):
+            # From Gio.ThemedIcon get the icon name only
+            icons = icon.get_names()
+            icon_name = icons[0] if icons else None
+        elif isinstance(icon, Gio.FileIcon):
+            # From Gio.FileIcon get the full file name
+            icon_name = icon.get_file().get_parse_name()
+        return (desktop_entry.get_name(),
+                desktop_entry.get_description() or '',
+                icon_name,
+                desktop_entry.should_show())
+
+    def add_search_index(self, desktop_entry, signature):
+        """Add the texts to search for an application"""
+        keywords = (desktop_entry.get_keywords()
+                    if isinstance(desktop_entry, Gio.DesktopAppInfo)
+                    else [])
+        self.search_index.add(key=desktop_entry.get_id(),
+                              name=signature[0],
+                              texts=[signature[1],
+                                     desktop_entry.get_id(),
+                                     *keywords])
+
+    def iter_applications(self):
+        """Iterate the (index, total, application) items in the catalog,
+        loading the catalog the first time"""
+        if self.loaded:
+            items = list(self.items.values())
+            for index, application in enumerate(items):
+                yield index, len(items), application
+        else:
+            desktop_entries = Gio.app_info_get_all()
+            items = {}
+            signatures = {}
+            # The search index is filled while loading the catalog
+            self.search_index.clear()
+            for index, desktop_entry in enumerate(desktop_entries):
+                try:
+                    signature = self.get_signature(desktop_entry)
+                    application = ApplicationInfo(desktop_entry.get_id(),
+                                                  *signature)
+                except Exception as e:
+                    logging.error(f'{desktop_entry.get_id()}: {e}')
+                    continue
+                items[application.filename] = application
+                signatures[application.filename] = signature
+                self.add_search_index(desktop_entry, signature)
+                yield index, len(desktop_entries), application
+            # Keep the catalog only when completely loaded
+            self.items = items
+            self.signatures = signatures
+            self.loaded = True
+
+    def refresh(self):
+        """Update only the added, changed and removed applications"""
+        items = {}
+        signatures = {}
+        for desktop_entry in Gio.app_info_get_all():
+            desktop_id = desktop_entry.get_id()
+            try:
+                signature = self.get_signature(desktop_entry)
+            except Exception as e:
+                logging.error(f'{desktop_id}: {e}')
+                continue
+            if self.signatures.get(desktop_id) == signature:
+                # Unchanged application
+                items[desktop_id] = self.items[desktop_id]
+            else:
+                logging.debug(f'Updating {desktop_id} in the catalog')
+                items[desktop_id] = ApplicationInfo(desktop_id, *signature)
+                self.add_search_index(desktop_entry, signature)
+            signatures[desktop_id] = signature
+        for desktop_id in self.items.keys() - items.keys():
+            self.search_index.remove(desktop_id)
+        self.items = items
+        self.signatures = signatures
+
+    def on_monitor_changed(self, monitor):
+        """Update the catalog after the installed applications change"""
+        if self.loaded:
+            self.refresh()
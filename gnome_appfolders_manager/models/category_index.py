@@ -0,0 +1,123 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import bisect
+import fnmatch
+import logging
+
+from gnome_appfolders_manager.models.desktop_index import get_desktop_index
+
+# Characters starting the wildcards part of a glob pattern
+GLOB_CHARACTERS = '*?['
+
+
+class CategoryIndex(object):
+    def __init__(self, desktop_index):
+        """Inverted index of the shown desktop files ids for each
+        category, like GNOME Shell only the shown applications are
+        included by the categories"""
+        self.desktop_index = desktop_index
+        self.categories = {}
+        # Indexed categories for each desktop file id
+        self.entries = {}
+        # Sorted desktop file ids to search the glob patterns
+        self.ids = []
+        self.generation = None
+
+    def refresh(self):
+        """Build the index again if the desktop index was changed"""
+        self.desktop_index.refresh()
+        if self.generation == self.desktop_index.generation:
+            return False
+        logging.debug('Building the categories index')
+        self.categories = {}
+        self.entries = {}
+        for filename, entry in self.desktop_index.entries.items():
+            self.add_entry(filename, entry)
+        self.ids = sorted(self.desktop_index.entries)
+        self.generation = self.desktop_index.generation
+        return True
+
+    def add_entry(self, filename, entry):
+        """Add a desktop file to its categories"""
+        categories = entry.categories if entry.visible else []
+        for category in categories:
+            self.categories.setdefault(category, set()).add(filename)
+        self.entries[filename] = categories
+
+    def remove_entry(self, filename):
+        """Remove a desktop file from its categories"""
+        for category in self.entries.pop(filename, []):
+            self.categories[category].discard(filename)
+            if not self.categories[category]:
+                self.categories.pop(category)
+
+    def update_entries(self, filenames):
+        """Update the index for some changed desktop files, after the
+        desktop index was updated"""
+        if self.generation is None:
+            # The index will be built at the first refresh
+            return
+        for filename in filenames:
+            if filename in self.entries:
+                self.remove_entry(filename)
+                self.ids.pop(bisect.bisect_left(self.ids, filename))
+            entry = self.desktop_index.get_entry(filename)
+            if entry:
+                self.add_entry(filename, entry)
+                bisect.insort(self.ids, filename)
+        self.generation = self.desktop_index.generation
+
+    def get_category(self, category):
+        """Return the desktop files ids for a category"""
+        return self.categories.get(category, set())
+
+    def get_glob(self, pattern):
+        """Return the desktop files ids matching a glob pattern"""
+        position = min((pattern.index(character)
+                        for character in GLOB_CHARACTERS
+                        if character in pattern), default=None)
+        if position is None:
+            # Plain desktop file id
+            if pattern in self.desktop_index.entries:
+                return {pattern}
+            return set()
+        # Check only the ids starting with the pattern literal prefix
+        prefix = pattern[:position]
+        result = set()
+        for index in range(bisect.bisect_left(self.ids, prefix),
+                           len(self.ids)):
+            desktop_id = self.ids[index]
+            if not desktop_id.startswith(prefix):
+                break
+            if fnmatch.fnmatchcase(desktop_id, pattern):
+                result.add(desktop_id)
+        return result
+
+
+shared_index = None
+
+
+def get_category_index():
+    """Return the CategoryIndex shared by every folder"""
+    global shared_index
+    if shared_index is None:
+        shared_index = CategoryIndex(desktop_index=get_desktop_index())
+    return shared_index
@@ -0,0 +1,207 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import json
+import logging
+import os
+
+from xdg import DesktopEntry, Locale
+
+from gnome_appfolders_manager.models.desktop_resolver import (
+    RESOURCE_APPLICATIONS,
+    get_desktop_resolver)
+
+INDEX_VERSION = 3
+
+
+class DesktopFileInfo(object):
+    def __init__(self, filename, path, mtime, name, comment, icon_name,
+                 categories, visible):
+        """Parsed information from a desktop file"""
+        self.filename = filename
+        self.path = path
+        self.mtime = mtime
+        self.name = name
+        self.comment = comment
+        self.icon_name = icon_name
+        self.categories = categories
+        self.visible = visible
+
+    @classmethod
+    def from_file(cls, filename, path, mtime):
+        """Parse a desktop file and return a DesktopFileInfo object"""
+        desktop_entry = DesktopEntry.DesktopEntry(path)
+        return cls(filename=filename,
+                   path=path,
+                   mtime=mtime,
+                   name=desktop_entry.getName(),
+                   comment=desktop_entry.getComment(),
+                   icon_name=desktop_entry.getIcon(),
+                   categories=desktop_entry.getCategories(),
+                   visible=not (desktop_entry.getNoDisplay() or
+                                desktop_entry.getHidden()))
+
+    def dump(self):
+        """Extract the desktop file data to a dict object"""
+        return {'path': self.path,
+                'mtime': self.mtime,
+                'name': self.name,
+                'comment': self.comment,
+                'icon': self.icon_name,
+                'categories': self.categories,
+                'visible': self.visible}
+
+    @classmethod
+    def load(cls, filename, data):
+        """Create a DesktopFileInfo object from a dict object"""
+        return cls(filename=filename,
+                   path=data['path'],
+                   mtime=data['mtime'],
+                   name=data['name'],
+                   comment=data['comment'],
+                   icon_name=data['icon'],
+                   categories=data['categories'],
+                   visible=data['visible'])
+
+
+class DesktopIndex(object):
+    def __init__(self, resolver, filename):
+        """Index the desktop files found by a DesktopResolver"""
+        self.resolver = resolver
+        self.filename = filename
+        # Scanned directories and modification times at the last update
+        self.directories = []
+        self.entries = {}
+        # Increased at every change to update the dependent indexes
+        self.generation = 0
+        self.load()
+        self.update()
+
+    def load(self):
+        """Load the index from the cache file"""
+        try:
+            with open(self.filename, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        # Discard indexes from other versions or other languages
+        if (data.get('version') != INDEX_VERSION or
+                data.get('resource') != self.resolver.resource or
+                data.get('locale') != Locale.langs):
+            return
+        self.directories = data['directories']
+        self.entries = {filename: DesktopFileInfo.load(filename, item)
+                        for filename, item in data['entries'].items()}
+
+    def save(self):
+        """Save the index to the cache file"""
+        data = {'version': INDEX_VERSION,
+                'resource': self.resolver.resource,
+                'locale': Locale.langs,
+                'directories': self.directories,
+                'entries': {filename: item.dump()
+                            for filename, item in self.entries.items()}}
+        path_temporary = self.filename.with_suffix('.tmp')
+        try:
+            with open(path_temporary, 'w') as file:
+                json.dump(data, file)
+            os.replace(path_temporary, self.filename)
+        except OSError as error:
+            logging.warning(f'Unable to save the desktop index: {error}')
+
+    def refresh(self):
+        """Update the index if any of the data directories was changed"""
+        self.resolver.refresh()
+        return self.update()
+
+    def update(self):
+        """Update the index entries from the resolved desktop files,
+        checking also the files changed in place which don't change the
+        modification time of their directories"""
+        entries = {}
+        for filename, path in self.resolver.paths.items():
+            entry = self.load_entry(filename=filename, path=path)
+            if entry:
+                entries[filename] = entry
+        if (self.resolver.directories == self.directories and
+                entries.keys() == self.entries.keys() and
+                all(entry is self.entries[filename]
+                    for filename, entry in entries.items())):
+            return False
+        logging.debug(f'Updating the desktop index for '
+                      f'{self.resolver.resource}')
+        self.directories = self.resolver.directories
+        self.entries = entries
+        self.generation += 1
+        self.save()
+        return True
+
+    def update_entries(self, filenames):
+        """Update the index entries for some changed desktop files"""
+        for filename in filenames:
+            path = self.resolver.resolve(filename)
+            entry = self.load_entry(filename=filename, path=path)
+            if entry:
+                self.entries[filename] = entry
+            else:
+                self.entries.pop(filename, None)
+        self.directories = self.resolver.directories
+        self.generation += 1
+        self.save()
+
+    def load_entry(self, filename, path):
+        """Return the indexed entry for a desktop file if still valid,
+        otherwise parse the desktop file again"""
+        if not path:
+            return None
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        entry = self.entries.get(filename)
+        if entry is None or entry.path != path or entry.mtime != mtime:
+            # Parse only new or modified desktop files
+            try:
+                entry = DesktopFileInfo.from_file(filename=filename,
+                                                  path=path,
+                                                  mtime=mtime)
+            except Exception as error:
+                logging.warning(f'{path}: {error}')
+                return None
+        return entry
+
+    def get_entry(self, filename):
+        """Return the DesktopFileInfo for a desktop file or None"""
+        return self.entries.get(filename)
+
+
+shared_index = None
+
+
+def get_desktop_index():
+    """Return the applications DesktopIndex shared by every folder"""
+    global shared_index
+    if shared_index is None:
+        # Resolving the cache path creates its folder, only when needed
+        from gnome_appfolders_manager.constants import FILE_DESKTOP_INDEX
+        shared_index = DesktopIndex(
+            resolver=get_desktop_resolver(RESOURCE_APPLICATIONS),
+            filename=FILE_DESKTOP_INDEX)
+    return shared_index
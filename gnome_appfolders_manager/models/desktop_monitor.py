@@ -0,0 +1,96 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import logging
+
+from gi.repository import Gio
+from gi.repository import GLib
+
+from gnome_appfolders_manager.models.category_index import (
+    get_category_index)
+from gnome_appfolders_manager.models.desktop_index import get_desktop_index
+from gnome_appfolders_manager.models.desktop_resolver import (
+    RESOURCE_APPLICATIONS,
+    RESOURCE_DIRECTORIES,
+    get_desktop_resolver)
+
+# Milliseconds to collect the changes before updating the desktop files
+CHANGES_DELAY = 1000
+
+
+class DesktopMonitor(object):
+    def __init__(self, callback):
+        """Monitor the desktop files directories, calling the callback
+        with the resource and the changed desktop file ids"""
+        self.callback = callback
+        self.monitors = {}
+        self.changed_paths = {}
+        self.timeout_id = None
+
+    def start(self):
+        """Monitor every scanned directory not already monitored"""
+        for resource in (RESOURCE_APPLICATIONS, RESOURCE_DIRECTORIES):
+            resolver = get_desktop_resolver(resource)
+            for directory, _ in resolver.directories:
+                if directory not in self.monitors:
+                    monitor = Gio.File.new_for_path(
+                        directory).monitor_directory(
+                        Gio.FileMonitorFlags.WATCH_MOVES, None)
+                    monitor.connect('changed',
+                                    self.on_monitor_changed,
+                                    resource)
+                    self.monitors[directory] = monitor
+
+    def stop(self):
+        """Stop monitoring every directory"""
+        for monitor in self.monitors.values():
+            monitor.cancel()
+        self.monitors.clear()
+        if self.timeout_id:
+            GLib.source_remove(self.timeout_id)
+            self.timeout_id = None
+
+    def on_monitor_changed(self, monitor, file, other_file, event_type,
+                           resource):
+        """Collect the changed paths to update them after a while"""
+        paths = self.changed_paths.setdefault(resource, set())
+        for item in (file, other_file):
+            if item and item.get_path():
+                paths.add(item.get_path())
+        if self.timeout_id is None:
+            self.timeout_id = GLib.timeout_add(CHANGES_DELAY,
+                                               self.on_timeout_changes)
+
+    def on_timeout_changes(self):
+        """Update the desktop files changed since the first change"""
+        self.timeout_id = None
+        changed_paths = self.changed_paths
+        self.changed_paths = {}
+        for resource, paths in changed_paths.items():
+            desktop_ids = get_desktop_resolver(resource).update(paths)
+            logging.debug(f'Changed {len(desktop_ids)} {resource} files')
+            if resource == RESOURCE_APPLICATIONS:
+                get_desktop_index().update_entries(desktop_ids)
+                get_category_index().update_entries(desktop_ids)
+            if desktop_ids:
+                self.callback(resource, desktop_ids)
+        # Monitor any new directory
+        self.start()
+        return GLib.SOURCE_REMOVE
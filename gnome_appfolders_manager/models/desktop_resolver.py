@@ -0,0 +1,174 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import logging
+import os
+
+from xdg import BaseDirectory
+
+RESOURCE_APPLICATIONS = 'applications'
+RESOURCE_DIRECTORIES = 'desktop-directories'
+
+
+class DesktopResolver(object):
+    def __init__(self, resource, suffix, recursive):
+        """Resolve desktop file ids from the XDG data directories"""
+        self.resource = resource
+        self.suffix = suffix
+        self.recursive = recursive
+        # Candidate data directories, in order of precedence
+        self.datadirs = [os.path.join(datadir, resource)
+                         for datadir in BaseDirectory.xdg_data_dirs]
+        # Scanned directories and modification times at the last scan
+        self.directories = []
+        # Desktop file ids prefix for each scanned directory
+        self.prefixes = {}
+        self.paths = {}
+        self.scan()
+
+    def get_directories(self):
+        """Return the scanned directories with their modification times"""
+        result = []
+        for directory, _ in self.directories:
+            try:
+                result.append([directory, os.stat(directory).st_mtime])
+            except OSError:
+                result.append([directory, None])
+        return result
+
+    def scan(self):
+        """List every data directory once and map the ids to their paths"""
+        logging.debug(f'Scanning the {self.resource} directories')
+        directories = []
+        prefixes = {}
+        paths = {}
+        # Devices and inodes of the scanned directories, to skip the
+        # symbolic links loops
+        visited = set()
+        for datadir in self.datadirs:
+            # Also missing data directories are recorded to detect their
+            # later creation
+            pending = [(datadir, '')]
+            while pending:
+                directory, prefix = pending.pop(0)
+                try:
+                    stat = os.stat(directory)
+                    if (stat.st_dev, stat.st_ino) in visited:
+                        continue
+                    with os.scandir(directory) as iterator:
+                        items = list(iterator)
+                except OSError:
+                    prefixes[directory] = prefix
+                    directories.append([directory, None])
+                    continue
+                visited.add((stat.st_dev, stat.st_ino))
+                prefixes[directory] = prefix
+                directories.append([directory, stat.st_mtime])
+                for item in items:
+                    if item.name.endswith(self.suffix):
+                        # Subdirectories ids are prefixed by the directories
+                        # names (kde/foo.desktop -> kde-foo.desktop)
+                        desktop_id = f'{prefix}{item.name}'
+                        # The first data directory takes precedence
+                        if desktop_id not in paths:
+                            paths[desktop_id] = item.path
+                    elif self.recursive:
+                        try:
+                            is_dir = item.is_dir()
+                        except OSError:
+                            # Broken entries are skipped
+                            continue
+                        if is_dir:
+                            pending.append((item.path,
+                                            f'{prefix}{item.name}-'))
+        self.directories = directories
+        self.prefixes = prefixes
+        self.paths = paths
+
+    def refresh(self):
+        """Scan again the data directories if any of them was changed"""
+        if self.get_directories() == self.directories:
+            return False
+        self.scan()
+        return True
+
+    def update(self, paths):
+        """Update the ids for some changed files paths and return the
+        changed ids"""
+        changed = set()
+        if any(path in self.prefixes or os.path.isdir(path)
+               for path in paths):
+            # Added or removed directories require a new scan
+            previous_paths = self.paths
+            self.scan()
+            changed.update(
+                desktop_id
+                for desktop_id in set(previous_paths) | set(self.paths)
+                if previous_paths.get(desktop_id) !=
+                self.paths.get(desktop_id))
+        for path in paths:
+            desktop_id = self.get_desktop_id(path)
+            if desktop_id:
+                changed.add(desktop_id)
+                path = self.find(desktop_id)
+                if path:
+                    self.paths[desktop_id] = path
+                else:
+                    self.paths.pop(desktop_id, None)
+        # Update the modification times to skip the next refresh
+        self.directories = self.get_directories()
+        return changed
+
+    def get_desktop_id(self, path):
+        """Return the desktop file id for a path in a scanned directory"""
+        directory, filename = os.path.split(path)
+        prefix = self.prefixes.get(directory)
+        if prefix is None or not filename.endswith(self.suffix):
+            return None
+        return f'{prefix}{filename}'
+
+    def find(self, desktop_id):
+        """Search the path for a desktop file id in the scanned directories
+        in order of precedence"""
+        for directory, mtime in self.directories:
+            prefix = self.prefixes[directory]
+            if mtime is not None and desktop_id.startswith(prefix):
+                path = os.path.join(directory, desktop_id[len(prefix):])
+                if os.path.isfile(path):
+                    return path
+        return None
+
+    def resolve(self, desktop_id):
+        """Return the path for a desktop file id or None"""
+        return self.paths.get(desktop_id)
+
+
+shared_resolvers = {}
+
+
+def get_desktop_resolver(resource):
+    """Return the DesktopResolver shared by every folder for a resource"""
+    if resource not in shared_resolvers:
+        shared_resolvers[resource] = DesktopResolver(
+            resource=resource,
+            suffix=('.directory' if resource == RESOURCE_DIRECTORIES
+                    else '.desktop'),
+            recursive=resource == RESOURCE_APPLICATIONS)
+    return shared_resolvers[resource]
@@ -18,13 +18,19 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 ##
 
-import pathlib
+from gi.repository import Gio, GLib
 
-from gi.repository import Gio
-
-from xdg import BaseDirectory, DesktopEntry
+from xdg import DesktopEntry
 
 from gnome_appfolders_manager.constants import SCHEMA_FOLDER
+from gnome_appfolders_manager.models.category_index import (
+    get_category_index)
+from gnome_appfolders_manager.models.desktop_resolver import (
+    RESOURCE_DIRECTORIES,
+    get_desktop_resolver)
+from gnome_appfolders_manager.models.settings_transaction import (
+    settings_transaction)
+from gnome_appfolders_manager.profiling import trace_span
 
 PATH_FOLDER = '/org/gnome/desktop/app-folders/folders/{folder}/'
 
@@ -32,49 +38,132 @@ OPTION_FOLDER_NAME = 'name'
 OPTION_FOLDER_TRANSLATE = 'translate'
 OPTION_FOLDER_APPS = 'apps'
 OPTION_FOLDER_CATEGORIES = 'categories'
+OPTION_FOLDER_EXCLUDED_APPS = 'excluded-apps'
 
 
 class FolderInfo(object):
+    @trace_span
     def __init__(self, folder):
-        """Find a folder from the settings"""
+        """Find a folder from the settings, its settings and desktop
+        directory file are loaded only when first accessed"""
         self.folder = folder
-        # Get info from the settings schema
-        folder_path = PATH_FOLDER.format(folder=folder)
-        self.settings = Gio.Settings.new_with_path(schema_id=SCHEMA_FOLDER,
-                                                   path=folder_path)
-        self.name = self.settings.get_string(OPTION_FOLDER_NAME)
-        self.translate = self.settings.get_boolean(OPTION_FOLDER_TRANSLATE)
-        self.apps = self.settings.get_strv(OPTION_FOLDER_APPS)
-        self.categories = self.settings.get_strv(OPTION_FOLDER_CATEGORIES)
-        self.desktop_entry = None
-        # Find desktop directory file
-        if self.name.endswith('.directory'):
-            datadirs = BaseDirectory.load_data_paths('desktop-directories')
-            for datadir in datadirs:
-                filename = pathlib.Path(datadir) / self.name
-                if filename.exists():
-                    self.desktop_entry = DesktopEntry.DesktopEntry(filename)
-                    break
-
-    def get_applications(self):
-        """Returns a dictionary object for each application"""
-        result = {}
-        datadirs = list(BaseDirectory.load_data_paths('applications'))
-        for application in self.apps:
-            for datadir in datadirs:
-                filename = pathlib.Path(datadir) / application
-                if filename.exists():
-                    desktop_entry = DesktopEntry.DesktopEntry(filename)
-                    break
-            else:
-                desktop_entry = None
-            result[application] = desktop_entry
+        self.__settings = None
+        self.__options = {}
+        self.__desktop_entry = None
+        self.__desktop_entry_loaded = False
+
+    @property
+    def settings(self):
+        """Return the Gio.Settings object for the folder"""
+        if self.__settings is None:
+            # Get info from the settings schema
+            folder_path = PATH_FOLDER.format(folder=self.folder)
+            self.__settings = Gio.Settings.new_with_path(
+                schema_id=SCHEMA_FOLDER,
+                path=folder_path)
+        return self.__settings
+
+    def reload(self):
+        """Discard the loaded values to read them again from the settings"""
+        self.__options.clear()
+        self.__desktop_entry_loaded = False
+
+    def is_option_changed(self, option):
+        """Check if a loaded settings value differs from the settings"""
+        return (option in self.__options and
+                self.__options[option] !=
+                self.settings.get_value(option).unpack())
+
+    def has_option(self, option):
+        """Check if the settings schema has a key, older schemas miss
+        some keys"""
+        return self.settings.props.settings_schema.has_key(option)
+
+    def get_option(self, option):
+        """Return a settings value, reading it only the first time"""
+        if option not in self.__options:
+            self.__options[option] = self.settings.get_value(option).unpack()
+        return self.__options[option]
+
+    @property
+    def name(self):
+        """Return the AppFolder name key"""
+        return self.get_option(OPTION_FOLDER_NAME)
+
+    @name.setter
+    def name(self, value):
+        """Update the AppFolder name key without saving it"""
+        self.__options[OPTION_FOLDER_NAME] = value
+        self.__desktop_entry_loaded = False
+
+    @property
+    def translate(self):
+        """Return the AppFolder translate key"""
+        return self.get_option(OPTION_FOLDER_TRANSLATE)
+
+    @property
+    def apps(self):
+        """Return the AppFolder applications list"""
+        return self.get_option(OPTION_FOLDER_APPS)
+
+    @property
+    def categories(self):
+        """Return the AppFolder categories list"""
+        return self.get_option(OPTION_FOLDER_CATEGORIES)
+
+    @property
+    def excluded_apps(self):
+        """Return the AppFolder excluded applications list"""
+        if not self.has_option(OPTION_FOLDER_EXCLUDED_APPS):
+            return []
+        return self.get_option(OPTION_FOLDER_EXCLUDED_APPS)
+
+    @property
+    def desktop_entry(self):
+        """Return the desktop directory file for the folder or None"""
+        if not self.__desktop_entry_loaded:
+            self.__desktop_entry = None
+            # Find desktop directory file
+            if self.name.endswith('.directory'):
+                filename = get_desktop_resolver(
+                    RESOURCE_DIRECTORIES).resolve(self.name)
+                if filename:
+                    self.__desktop_entry = DesktopEntry.DesktopEntry(filename)
+            self.__desktop_entry_loaded = True
+        return self.__desktop_entry
+
+    def get_category_applications(self):
+        """Return the shown applications matching the AppFolder
+        categories"""
+        category_index = get_category_index()
+        category_index.refresh()
+        result = set()
+        for category in self.categories:
+            result.update(category_index.get_category(category))
+        return result
+
+    @trace_span
+    def get_effective_applications(self):
+        """Return the applications shown by GNOME Shell in the AppFolder
+        (apps and categories, without excluded-apps), with the category
+        they come from or None for the apps key"""
+        excluded = set(self.excluded_apps)
+        result = {application: None
+                  for application in self.apps
+                  if application not in excluded}
+        category_index = get_category_index()
+        category_index.refresh()
+        for category in self.categories:
+            for application in category_index.get_category(category):
+                if application not in excluded:
+                    result.setdefault(application, category)
         return result
 
     def set_applications(self, applications):
         """Set the applications list"""
-        self.apps = applications
-        self.settings.set_strv(OPTION_FOLDER_APPS, list(self.apps))
+        self.__options[OPTION_FOLDER_APPS] = list(applications)
+        with settings_transaction(self.settings):
+            self.settings.set_strv(OPTION_FOLDER_APPS, self.apps)
 
     def get_name(self):
         """Return the AppFolder name"""
@@ -87,7 +176,22 @@ class FolderInfo(object):
 
     def set_title(self, title):
         """Set the AppFolder title"""
-        self.settings.set_string(OPTION_FOLDER_NAME, title)
+        self.name = title
+        with settings_transaction(self.settings):
+            self.settings.set_string(OPTION_FOLDER_NAME, title)
+
+    def set_options(self, options):
+        """Set several settings values together"""
+        with settings_transaction(self.settings):
+            for option, value in options.items():
+                # Use the same variant type of the current value
+                value_type = self.settings.get_value(option).get_type_string()
+                # Update the loaded value before the changed signal
+                self.__options[option] = value
+                self.settings.set_value(option,
+                                        GLib.Variant(value_type, value))
+        if OPTION_FOLDER_NAME in options:
+            self.__desktop_entry_loaded = False
 
     def get_icon_name(self):
         """Return the AppFolder icon name"""
@@ -95,8 +199,10 @@ class FolderInfo(object):
 
     def remove(self):
         """Remove the AppFolder by resetting all the children keys"""
-        for key in self.settings.keys():
-            self.settings.reset(key)
+        with settings_transaction(self.settings):
+            for key in self.settings.keys():
+                self.settings.reset(key)
+        self.reload()
 
     def get_readonly(self):
         """Check if the folder name is read-only (its name is got from
@@ -0,0 +1,119 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import fnmatch
+
+from gnome_appfolders_manager.models.folder_info import FolderInfo
+from gnome_appfolders_manager.models.settings_transaction import (
+    settings_transaction)
+
+RULES_VERSION = 1
+
+
+class FolderRule(object):
+    def __init__(self, folder, categories, include, exclude):
+        """Rule to select the applications for a folder by categories and
+        desktop files ids glob patterns"""
+        self.folder = folder
+        self.categories = categories
+        self.include = include
+        self.exclude = exclude
+
+    @classmethod
+    def load(cls, data):
+        """Create a FolderRule object from a dict object"""
+        if not isinstance(data, dict) or not data.get('folder'):
+            raise FolderRulesError(f'Invalid rule: {data}')
+        values = {}
+        for key in ('categories', 'include', 'exclude'):
+            values[key] = data.get(key, [])
+            if (not isinstance(values[key], list) or
+                    not all(isinstance(value, str)
+                            for value in values[key])):
+                raise FolderRulesError(
+                    f'Invalid {key} for the folder {data["folder"]}')
+        return cls(folder=data['folder'], **values)
+
+
+class FolderRulesEngine(object):
+    def __init__(self, category_index):
+        """Evaluate the folders rules against a CategoryIndex"""
+        self.category_index = category_index
+
+    def load_rules(self, data):
+        """Return the rules from a dict object"""
+        if not isinstance(data, dict) or data.get('version') != RULES_VERSION:
+            raise FolderRulesError('Unsupported rules version')
+        if not isinstance(data.get('rules'), list):
+            raise FolderRulesError('The rules must be a list')
+        return [FolderRule.load(item) for item in data['rules']]
+
+    def match(self, rule):
+        """Return the desktop files ids matching a rule"""
+        result = set()
+        for category in rule.categories:
+            result.update(self.category_index.get_category(category))
+        for pattern in rule.include:
+            result.update(self.category_index.get_glob(pattern))
+        for pattern in rule.exclude:
+            result.difference_update(self.category_index.get_glob(pattern))
+        return result
+
+    def propose(self, rules):
+        """Return the applications to add and remove for each folder,
+        merging the rules for the same folder"""
+        folders = {}
+        for rule in rules:
+            if rule.folder not in folders:
+                folders[rule.folder] = (FolderInfo(rule.folder), set(), [])
+            folder_info, matching, exclude = folders[rule.folder]
+            matching.update(self.match(rule))
+            exclude.extend(rule.exclude)
+        proposals = {}
+        for folder, (folder_info, matching, exclude) in folders.items():
+            applications = set(folder_info.apps)
+            # The applications excluded by any rule for the folder
+            excluded = {application
+                        for application in applications | matching
+                        if any(fnmatch.fnmatchcase(application, pattern)
+                               for pattern in exclude)}
+            # The applications matched by the folder categories are already
+            # shown by GNOME Shell and are not added to the apps key
+            added = (matching - applications - excluded -
+                     folder_info.get_category_applications())
+            removed = applications & excluded
+            if added or removed:
+                proposals[folder] = (sorted(added), sorted(removed))
+        return proposals
+
+    def apply(self, proposals):
+        """Apply the proposed changes to every folder in one transaction"""
+        folders = [FolderInfo(folder) for folder in proposals]
+        with settings_transaction(*[folder_info.settings
+                                    for folder_info in folders]):
+            for folder_info in folders:
+                added, removed = proposals[folder_info.folder]
+                folder_info.set_applications(
+                    [application for application in folder_info.apps
+                     if application not in removed] + added)
+
+
+class FolderRulesError(Exception):
+    pass
@@ -0,0 +1,54 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+
+class FoldersIndex(object):
+    def __init__(self):
+        """Reverse index of the folders containing each application"""
+        self.applications = {}
+        # Indexed applications and title for each folder
+        self.folders = {}
+        self.titles = {}
+
+    def set_folder(self, folder, title, applications):
+        """Add or replace the applications for a folder"""
+        self.remove_folder(folder)
+        self.folders[folder] = set(applications)
+        self.titles[folder] = title
+        for application in self.folders[folder]:
+            self.applications.setdefault(application, set()).add(folder)
+
+    def remove_folder(self, folder):
+        """Remove the applications for a folder"""
+        for application in self.folders.pop(folder, ()):
+            folders = self.applications[application]
+            folders.discard(folder)
+            if not folders:
+                self.applications.pop(application)
+        self.titles.pop(folder, None)
+
+    def get_folders(self, application):
+        """Return the sorted folders containing an application"""
+        return sorted(self.applications.get(application, ()))
+
+    def get_titles(self, application):
+        """Return the sorted folders titles containing an application"""
+        return sorted(self.titles[folder]
+                      for folder in self.applications.get(application, ()))
@@ -0,0 +1,136 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import itertools
+
+from gnome_appfolders_manager.models.folder_info import (
+    FolderInfo,
+    OPTION_FOLDER_APPS,
+    OPTION_FOLDER_CATEGORIES,
+    OPTION_FOLDER_EXCLUDED_APPS,
+    OPTION_FOLDER_NAME,
+    OPTION_FOLDER_TRANSLATE)
+from gnome_appfolders_manager.models.settings_transaction import (
+    settings_transaction)
+
+LAYOUT_VERSION = 1
+LAYOUT_FOLDER = 'folder'
+# Folder options saved in the layout with their expected types
+LAYOUT_OPTIONS = {OPTION_FOLDER_NAME: str,
+                  OPTION_FOLDER_TRANSLATE: bool,
+                  OPTION_FOLDER_APPS: list,
+                  OPTION_FOLDER_CATEGORIES: list,
+                  OPTION_FOLDER_EXCLUDED_APPS: list}
+
+
+class FoldersLayout(object):
+    def __init__(self, folders_list):
+        """Export and import the whole AppFolders layout"""
+        self.folders_list = folders_list
+
+    def export(self):
+        """Return the layout for the current folders"""
+        folders = []
+        for folder in self.folders_list.get_folders():
+            folder_info = FolderInfo(folder)
+            item = {LAYOUT_FOLDER: folder}
+            for option in LAYOUT_OPTIONS:
+                # Older settings schemas miss some keys
+                if folder_info.has_option(option):
+                    item[option] = folder_info.get_option(option)
+            folders.append(item)
+        return {'version': LAYOUT_VERSION,
+                'folders': folders}
+
+    def validate(self, layout):
+        """Check a layout and return its folders"""
+        if not isinstance(layout, dict):
+            raise FoldersLayoutError('The layout must be an object')
+        if layout.get('version') != LAYOUT_VERSION:
+            raise FoldersLayoutError(
+                f'Unsupported layout version: {layout.get("version")}')
+        folders = layout.get('folders')
+        if not isinstance(folders, list):
+            raise FoldersLayoutError('The layout folders must be a list')
+        names = set()
+        for item in folders:
+            if not isinstance(item, dict):
+                raise FoldersLayoutError(f'Invalid folder: {item}')
+            folder = item.get(LAYOUT_FOLDER)
+            if not isinstance(folder, str) or not folder or '/' in folder:
+                raise FoldersLayoutError(f'Invalid folder: {item}')
+            if folder in names:
+                raise FoldersLayoutError(f'Duplicated folder: {folder}')
+            names.add(folder)
+            for option, option_type in LAYOUT_OPTIONS.items():
+                if option not in item:
+                    continue
+                value = item[option]
+                if (not isinstance(value, option_type) or
+                        (option_type is list and
+                         not all(isinstance(v, str) for v in value))):
+                    raise FoldersLayoutError(
+                        f'Invalid {option} for the folder {folder}')
+        return folders
+
+    def get_changes(self, layout, remove_missing=True):
+        """Compare a layout with the current folders and return the folders
+        to remove, the options to set for each folder and the new folders
+        list"""
+        folders = self.validate(layout)
+        current = self.folders_list.get_folders()
+        names = [item[LAYOUT_FOLDER] for item in folders]
+        removed = [folder for folder in current
+                   if folder not in names] if remove_missing else []
+        changes = {}
+        for item in folders:
+            folder_info = FolderInfo(item[LAYOUT_FOLDER])
+            # Only the different options are written
+            options = {option: item[option]
+                       for option in LAYOUT_OPTIONS
+                       if option in item and
+                       folder_info.has_option(option) and
+                       item[option] != folder_info.get_option(option)}
+            if options:
+                changes[folder_info.folder] = options
+        # Keep the layout order, then the folders not in the layout
+        children = names + [folder for folder in current
+                            if folder not in names and folder not in removed]
+        if children == current:
+            children = None
+        return removed, changes, children
+
+    def apply(self, removed, changes, children):
+        """Apply the changes from get_changes in a single transaction"""
+        folders = {folder: FolderInfo(folder)
+                   for folder in itertools.chain(removed, changes)}
+        with settings_transaction(self.folders_list.settings,
+                                  *[folder_info.settings
+                                    for folder_info in folders.values()]):
+            for folder in removed:
+                folders[folder].remove()
+            for folder, options in changes.items():
+                folders[folder].set_options(options)
+            if children is not None:
+                self.folders_list.set_folders(children)
+
+
+class FoldersLayoutError(Exception):
+    pass
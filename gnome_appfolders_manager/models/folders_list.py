@@ -0,0 +1,58 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+from gi.repository import Gio
+
+from gnome_appfolders_manager.constants import SCHEMA_FOLDERS
+from gnome_appfolders_manager.models.settings_transaction import (
+    settings_transaction)
+
+OPTION_FOLDER_CHILDREN = 'folder-children'
+
+
+class FoldersList(object):
+    def __init__(self):
+        """Access the AppFolders list from the settings"""
+        self.settings = Gio.Settings.new(SCHEMA_FOLDERS)
+
+    def get_folders(self):
+        """Return the AppFolders names"""
+        return self.settings.get_strv(OPTION_FOLDER_CHILDREN)
+
+    def set_folders(self, folders):
+        """Set the AppFolders names"""
+        with settings_transaction(self.settings):
+            self.settings.set_strv(OPTION_FOLDER_CHILDREN, list(folders))
+
+    def add_folder(self, folder):
+        """Add an AppFolder name to the folders list"""
+        with settings_transaction(self.settings):
+            folders = self.get_folders()
+            if folder not in folders:
+                folders.append(folder)
+                self.set_folders(folders)
+
+    def remove_folder(self, folder):
+        """Remove an AppFolder name from the folders list"""
+        with settings_transaction(self.settings):
+            folders = self.get_folders()
+            if folder in folders:
+                folders.remove(folder)
+                self.set_folders(folders)
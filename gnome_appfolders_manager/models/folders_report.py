@@ -0,0 +1,136 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+from gnome_appfolders_manager.models.desktop_resolver import (
+    RESOURCE_DIRECTORIES,
+    get_desktop_resolver)
+from gnome_appfolders_manager.models.folder_info import (
+    OPTION_FOLDER_APPS,
+    OPTION_FOLDER_EXCLUDED_APPS,
+    OPTION_FOLDER_NAME,
+    FolderInfo)
+from gnome_appfolders_manager.models.folders_index import FoldersIndex
+from gnome_appfolders_manager.models.settings_transaction import (
+    settings_transaction)
+
+
+class FoldersReport(object):
+    def __init__(self, folders_list):
+        """Report the duplicated applications and the conflicts between
+        the AppFolders"""
+        self.folders_list = folders_list
+        self.folders = {}
+        self.folders_index = FoldersIndex()
+        # Applications shown in more than a folder, with their folders
+        self.duplicates = {}
+        # Applications both in apps and matched by categories, per folder
+        self.redundant = {}
+        # Folders whose desktop directory file name doesn't resolve
+        self.unresolved = []
+        # Duplicated applications matched by the categories of folders
+        # without the excluded-apps key, with these folders
+        self.unfixable = {}
+        # Applications matched by the categories of each folder
+        self.matching = {}
+
+    def scan(self):
+        """Scan every folder once and collect the issues"""
+        self.folders = {folder: FolderInfo(folder)
+                        for folder in self.folders_list.get_folders()}
+        self.folders_index = FoldersIndex()
+        self.redundant = {}
+        self.unresolved = []
+        self.matching = {}
+        resolver = get_desktop_resolver(RESOURCE_DIRECTORIES)
+        resolver.refresh()
+        for folder, folder_info in self.folders.items():
+            applications = folder_info.get_effective_applications()
+            self.folders_index.set_folder(folder=folder,
+                                          title=folder_info.get_name(),
+                                          applications=applications)
+            self.matching[folder] = folder_info.get_category_applications()
+            redundant = [application
+                         for application, category in applications.items()
+                         if category is None and
+                         application in self.matching[folder]]
+            if redundant:
+                self.redundant[folder] = redundant
+            if (folder_info.get_readonly() and
+                    not resolver.resolve(folder_info.name)):
+                self.unresolved.append(folder)
+        # Keep the folders in the same order of the folders list
+        order = list(self.folders)
+        self.duplicates = {
+            application: sorted(folders, key=order.index)
+            for application, folders in sorted(
+                self.folders_index.applications.items())
+            if len(folders) > 1}
+        # The applications can be hidden from the categories of the other
+        # folders only using the excluded-apps key
+        self.unfixable = {}
+        for application, folders in self.duplicates.items():
+            folders = [folder for folder in folders[1:]
+                       if application in self.matching[folder] and
+                       not self.folders[folder].has_option(
+                           OPTION_FOLDER_EXCLUDED_APPS)]
+            if folders:
+                self.unfixable[application] = folders
+
+    def has_issues(self):
+        """Check if any issue was found by the last scan"""
+        return bool(self.duplicates or self.redundant or self.unresolved)
+
+    def get_fixes(self):
+        """Return the settings values to fix the issues for each folder"""
+        changes = {}
+        for folder, applications in self.redundant.items():
+            # The categories already include the applications
+            changes[folder] = {OPTION_FOLDER_APPS: [
+                application for application in self.folders[folder].apps
+                if application not in applications]}
+        for application, folders in self.duplicates.items():
+            # Keep each application only in the first folder
+            for folder in folders[1:]:
+                folder_info = self.folders[folder]
+                options = changes.setdefault(folder, {})
+                options[OPTION_FOLDER_APPS] = [
+                    item for item in options.get(OPTION_FOLDER_APPS,
+                                                 folder_info.apps)
+                    if item != application]
+                if (folder_info.has_option(OPTION_FOLDER_EXCLUDED_APPS) and
+                        application in self.matching[folder]):
+                    # Exclude the applications included by the categories
+                    excluded = options.get(OPTION_FOLDER_EXCLUDED_APPS,
+                                           list(folder_info.excluded_apps))
+                    if application not in excluded:
+                        excluded.append(application)
+                    options[OPTION_FOLDER_EXCLUDED_APPS] = excluded
+        for folder in self.unresolved:
+            # Replace the missing desktop directory file with a plain title
+            changes.setdefault(folder, {})[OPTION_FOLDER_NAME] = (
+                self.folders[folder].name[:-len('.directory')])
+        return changes
+
+    def apply(self, changes):
+        """Apply the changes from get_fixes in a single transaction"""
+        with settings_transaction(*[self.folders[folder].settings
+                                    for folder in changes]):
+            for folder, options in changes.items():
+                self.folders[folder].set_options(options)
@@ -0,0 +1,149 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import unicodedata
+
+# Scores for the query terms found in the applications
+SCORE_NAME_PREFIX = 100
+SCORE_NAME_WORD = 60
+SCORE_NAME = 40
+SCORE_OTHER = 20
+SCORE_SIMILAR = 10
+# Minimum fraction of shared trigrams for a similar term
+SIMILAR_THRESHOLD = 0.5
+
+
+def normalize(text):
+    """Return a casefolded text without the accents"""
+    return ''.join(character
+                   for character in unicodedata.normalize('NFKD',
+                                                          text.casefold())
+                   if not unicodedata.combining(character))
+
+
+def get_trigrams(text):
+    """Return the set of the three characters sequences in a text"""
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+class SearchIndex(object):
+    def __init__(self):
+        """Index the applications texts to search them while typing"""
+        # Normalized name and other texts for each key
+        self.documents = {}
+        # Keys containing each trigram
+        self.trigrams = {}
+
+    def add(self, key, name, texts):
+        """Add or replace the texts for a key"""
+        self.remove(key)
+        name = normalize(name)
+        other = normalize(' '.join(text for text in texts if text))
+        self.documents[key] = (name, other)
+        for trigram in get_trigrams(name) | get_trigrams(other):
+            self.trigrams.setdefault(trigram, set()).add(key)
+
+    def remove(self, key):
+        """Remove the texts for a key"""
+        if key not in self.documents:
+            return
+        name, other = self.documents.pop(key)
+        for trigram in get_trigrams(name) | get_trigrams(other):
+            keys = self.trigrams[trigram]
+            keys.discard(key)
+            if not keys:
+                self.trigrams.pop(trigram)
+
+    def clear(self):
+        """Remove every document"""
+        self.documents.clear()
+        self.trigrams.clear()
+
+    def get_candidates(self, term):
+        """Return the keys which could contain a term, or None to check
+        every key for the shorter terms"""
+        trigrams = get_trigrams(term)
+        if not trigrams:
+            return None
+        # Intersect the smallest sets first
+        postings = sorted((self.trigrams.get(trigram, set())
+                           for trigram in trigrams), key=len)
+        candidates = set(postings[0])
+        for keys in postings[1:]:
+            if not candidates:
+                break
+            candidates &= keys
+        return candidates
+
+    def get_similar(self, term):
+        """Return the keys sharing most of the trigrams with a term, with
+        the fraction of the shared trigrams"""
+        trigrams = get_trigrams(term)
+        counts = {}
+        for trigram in trigrams:
+            for key in self.trigrams.get(trigram, ()):
+                counts[key] = counts.get(key, 0) + 1
+        return {key: count / len(trigrams)
+                for key, count in counts.items()
+                if count / len(trigrams) >= SIMILAR_THRESHOLD}
+
+    def get_score(self, name, other, term):
+        """Return the score for a term contained in a document or 0"""
+        if name.startswith(term):
+            return SCORE_NAME_PREFIX
+        elif f' {term}' in name:
+            return SCORE_NAME_WORD
+        elif term in name:
+            return SCORE_NAME
+        elif term in other:
+            return SCORE_OTHER
+        return 0
+
+    def search(self, query):
+        """Return the score for every key matching all the query terms,
+        or None for an empty query"""
+        terms = normalize(query).split()
+        if not terms:
+            return None
+        results = None
+        # Check the longest terms first to reduce the candidates
+        for term in sorted(terms, key=len, reverse=True):
+            candidates = self.get_candidates(term)
+            if candidates is None:
+                candidates = self.documents.keys()
+            if results is not None:
+                candidates = results.keys() & candidates
+            scores = {}
+            for key in candidates:
+                score = self.get_score(*self.documents[key], term)
+                if score:
+                    scores[key] = score
+            if not scores and len(term) > 3:
+                # Accept the misspelled terms sharing most of the trigrams
+                for key, fraction in self.get_similar(term).items():
+                    if results is None or key in results:
+                        scores[key] = SCORE_SIMILAR * fraction
+            if results is not None:
+                for key in scores:
+                    scores[key] += results[key]
+            results = scores
+            if not results:
+                break
+        return results
@@ -0,0 +1,47 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import contextlib
+
+# Nesting level of the open transactions for each Gio.Settings object
+transactions_depth = {}
+
+
+@contextlib.contextmanager
+def settings_transaction(*settings_list):
+    """Delay the changes to some Gio.Settings objects and apply them all
+    together when the outermost transaction ends, or revert them if an
+    exception was raised"""
+    for settings in settings_list:
+        settings.delay()
+        transactions_depth[settings] = transactions_depth.get(settings, 0) + 1
+    succeeded = False
+    try:
+        yield
+        succeeded = True
+    finally:
+        for settings in settings_list:
+            transactions_depth[settings] -= 1
+            if not transactions_depth[settings]:
+                transactions_depth.pop(settings)
+                if succeeded:
+                    settings.apply()
+                else:
+                    settings.revert()
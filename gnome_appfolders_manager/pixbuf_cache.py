@@ -0,0 +1,114 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import collections
+import logging
+
+from gi.repository import Gtk
+
+
+class PixbufCache(object):
+    def __init__(self, budget):
+        """Least recently used cache of GdkPixbuf objects"""
+        # Maximum size in bytes for all the cached pixbufs
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.items = collections.OrderedDict()
+        # Icons not found during the current session
+        self.missing = set()
+        self.theme = None
+
+    def get_key(self, icon_name, size, scale):
+        """Return the cache key for an icon in the current icon theme"""
+        if self.theme is None:
+            # Invalidate the cache when the icon theme changes
+            self.theme = Gtk.IconTheme.get_default()
+            self.theme.connect('changed', self.on_theme_changed)
+        theme_name = Gtk.Settings.get_default().props.gtk_icon_theme_name
+        return icon_name, size, scale, theme_name
+
+    def get(self, key):
+        """Return a cached pixbuf or None"""
+        pixbuf = self.items.get(key)
+        if pixbuf is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.items.move_to_end(key)
+        return pixbuf
+
+    def peek(self, key):
+        """Return a cached pixbuf or None without counting hits and
+        misses, used while rendering the cells"""
+        pixbuf = self.items.get(key)
+        if pixbuf is not None:
+            self.items.move_to_end(key)
+        return pixbuf
+
+    def add(self, key, pixbuf):
+        """Add a pixbuf to the cache, discarding the least recently used"""
+        if key in self.items:
+            self.size -= self.items.pop(key).get_byte_length()
+        self.items[key] = pixbuf
+        self.size += pixbuf.get_byte_length()
+        self.shrink()
+
+    def shrink(self):
+        """Discard the least recently used pixbufs exceeding the budget"""
+        while self.size > self.budget and self.items:
+            _, pixbuf = self.items.popitem(last=False)
+            self.size -= pixbuf.get_byte_length()
+
+    def is_missing(self, key):
+        """Check if an icon was already known to be missing"""
+        return key in self.missing
+
+    def add_missing(self, key):
+        """Remember a missing icon for the current session"""
+        self.missing.add(key)
+
+    def set_budget(self, budget):
+        """Set the maximum size in bytes for the cached pixbufs"""
+        self.budget = budget
+        self.shrink()
+
+    def clear(self):
+        """Remove every cached pixbuf and missing icon"""
+        self.items.clear()
+        self.missing.clear()
+        self.size = 0
+
+    def log_statistics(self):
+        """Log the cache usage statistics"""
+        logging.debug(f'Pixbuf cache: {len(self.items)} items, '
+                      f'{self.size} bytes of {self.budget}, '
+                      f'{self.hits} hits, {self.misses} misses, '
+                      f'{len(self.missing)} missing icons')
+
+    def on_theme_changed(self, theme):
+        """Discard the pixbufs loaded from the previous icon theme"""
+        logging.debug('Icon theme changed, clearing the pixbuf cache')
+        self.clear()
+
+
+# Default budget of 32 MiB, about 3,600 icons at 48x48 pixels
+pixbuf_cache = PixbufCache(budget=32 * 1024 * 1024)
@@ -0,0 +1,129 @@
+##
+#     Project: GNOME AppFolders Manager
+# Description: Manage GNOME Shell applications folders
+#      Author: Fabio Castelli (Muflone) <muflone@muflone.com>
+#   Copyright: 2016-2022 Fabio Castelli
+#     License: GPL-3+
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+##
+
+import cProfile
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+
+class TraceRecorder(object):
+    def __init__(self):
+        """Record the timing spans in the Chrome trace events format"""
+        self.enabled = False
+        self.events = []
+
+    def enable(self):
+        """Enable the recording, it must be called before importing the
+        modules with the traced functions"""
+        self.enabled = True
+
+    def add_span(self, name, started, elapsed):
+        """Add a completed span with times in seconds"""
+        self.events.append({'name': name,
+                            'ph': 'X',
+                            'ts': started * 1000000,
+                            'dur': elapsed * 1000000,
+                            'pid': os.getpid(),
+                            'tid': threading.get_ident()})
+
+    def save(self, filename):
+        """Write the recorded spans to a JSON file"""
+        logging.info(f'Writing {len(self.events)} trace events '
+                     f'to {filename}')
+        try:
+            with open(filename, 'w') as file:
+                json.dump({'traceEvents': self.events,
+                           'displayTimeUnit': 'ms'}, file)
+        except OSError as error:
+            logging.error(f'Unable to write the trace file: {error}')
+
+
+trace_recorder = TraceRecorder()
+
+
+class SessionProfiler(object):
+    def __init__(self):
+        """Profile the CPU and memory usage for the whole session"""
+        self.cpu_profile = None
+
+    def start(self, cpu, memory, frames=10):
+        """Start the requested profilers"""
+        if memory:
+            tracemalloc.start(frames)
+        if cpu:
+            self.cpu_profile = cProfile.Profile()
+            self.cpu_profile.enable()
+
+    def save(self, cpu_filename, memory_filename, limit=50):
+        """Stop the profilers and write their results"""
+        if self.cpu_profile:
+            self.cpu_profile.disable()
+            logging.info(f'Writing the CPU profile to {cpu_filename}')
+            try:
+                self.cpu_profile.dump_stats(cpu_filename)
+            except OSError as error:
+                logging.error(f'Unable to write the CPU profile: {error}')
+            self.cpu_profile = None
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            logging.info(f'Writing the memory profile to {memory_filename}')
+            try:
+                with open(memory_filename, 'w') as file:
+                    file.write(f'Current memory: {current} bytes\n'
+                               f'Peak memory: {peak} bytes\n\n'
+                               f'Top {limit} allocations:\n')
+                    for statistic in snapshot.statistics('lineno')[:limit]:
+                        file.write(f'{statistic}\n')
+                    file.write(f'\nTop {limit} allocations tracebacks:\n')
+                    for statistic in snapshot.statistics(
+                            'traceback')[:limit]:
+                        file.write(f'\n{statistic}\n')
+                        for line in statistic.traceback.format():
+                            file.write(f'{line}\n')
+            except OSError as error:
+                logging.error(f'Unable to write the memory profile: {error}')
+
+
+session_profiler = SessionProfiler()
+
+
+def trace_span(function):
+    """Record a timing span for every function call when the tracing is
+    enabled, or return the function unchanged"""
+    if not trace_recorder.enabled:
+        return function
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            trace_recorder.add_span(name=function.__qualname__,
+                                    started=started,
+                                    elapsed=time.perf_counter() - started)
+    return wrapper
@@ -34,6 +34,12 @@ SECTION_APP_PICKER = 'application picker'
 PREFERENCES_SHOW_MISSING = 'show missing files'
 DEFAULT_VALUES[PREFERENCES_SHOW_MISSING] = (SECTION_PREFERENCES, False)
 
+PREFERENCES_ICONS_CACHE_SIZE = 'icons cache size'
+DEFAULT_VALUES[PREFERENCES_ICONS_CACHE_SIZE] = (SECTION_PREFERENCES, 32)
+
+PREFERENCES_LAZY_ICONS = 'lazy icons'
+DEFAULT_VALUES[PREFERENCES_LAZY_ICONS] = (SECTION_PREFERENCES, True)
+
 APP_PICKER_SHOW_HIDDEN = 'show hidden'
 DEFAULT_VALUES[APP_PICKER_SHOW_HIDDEN] = (SECTION_APP_PICKER, False)
 
@@ -29,30 +29,33 @@ from gnome_appfolders_manager.localize import (store_message,
 
 
 # Load domain for translation
-for module in (gettext, locale):
-    module.bindtextdomain(APP_DOMAIN, DIR_LOCALE)
-    module.textdomain(APP_DOMAIN)
+def load_translations():
+    """Load the translations and the messages translated from GTK+"""
+    for module in (gettext, locale):
+        module.bindtextdomain(APP_DOMAIN, DIR_LOCALE)
+        module.textdomain(APP_DOMAIN)
 
-# Import some translated messages from GTK+ domain
-for message in ('About', 'A folder with that name already exists',
-                '_Close', '_Create', 'Create Folder', 'Files', 'General',
-                'Properties', '_Remove', '_Save', 'Search',
-                'Show _Hidden Files'):
-    store_message(strip_colon(strip_underline(message)),
-                  strip_colon(strip_underline(text(message=message,
-                                                   gtk30=True))))
+    # Import some translated messages from GTK+ domain
+    for message in ('About', 'A folder with that name already exists',
+                    '_Close', '_Create', 'Create Folder', 'Files', 'General',
+                    'Properties', '_Remove', '_Save', 'Search',
+                    'Show _Hidden Files'):
+        store_message(strip_colon(strip_underline(message)),
+                      strip_colon(strip_underline(text(message=message,
+                                                       gtk30=True))))
 
-# Import some translated messages from GTK+ domain and context
-for message in ('_Delete', '_New', '_Quit'):
-    store_message(strip_colon(strip_underline(message)),
-                  strip_colon(strip_underline(text(message=message,
-                                                   gtk30=True,
-                                                   context='Stock label'))))
+    # Import some translated messages from GTK+ domain and context
+    for message in ('_Delete', '_New', '_Quit'):
+        translated = text(message=message,
+                          gtk30=True,
+                          context='Stock label')
+        store_message(strip_colon(strip_underline(message)),
+                      strip_colon(strip_underline(translated)))
 
-# Import some variations
-store_message('Files:', '%s:' % text(message='Files',
-                                     gtk30=True))
-store_message('Folder Name:', '%s:' % text(message='Folder Name',
-                                           gtk30=True))
-store_message('Folders:', '%s:' % text(message='Folders',
-                                       gtk30=False))
+    # Import some variations
+    store_message('Files:', '%s:' % text(message='Files',
+                                         gtk30=True))
+    store_message('Folder Name:', '%s:' % text(message='Folder Name',
+                                               gtk30=True))
+    store_message('Folders:', '%s:' % text(message='Folders',
+                                           gtk30=False))
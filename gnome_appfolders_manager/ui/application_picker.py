@@ -20,20 +20,25 @@
 
 import logging
 
-from gi.repository import Gio
+from gi.repository import GLib
 from gi.repository import Gtk
 
 from gnome_appfolders_manager.functions import get_treeview_selected_rows
-from gnome_appfolders_manager.models.application_info import ApplicationInfo
+from gnome_appfolders_manager.localize import _
 from gnome_appfolders_manager.models.applications import ModelApplications
-from gnome_appfolders_manager.settings import APP_PICKER_SHOW_HIDDEN
+from gnome_appfolders_manager.profiling import trace_span
+from gnome_appfolders_manager.settings import (APP_PICKER_SHOW_HIDDEN,
+                                               PREFERENCES_LAZY_ICONS)
 from gnome_appfolders_manager.ui.base import UIBase
 
 SECTION_WINDOW_NAME = 'application picker'
+LOADING_BATCH_SIZE = 50
 
 
 class UIApplicationPicker(UIBase):
-    def __init__(self, parent, settings, options, existing_files):
+    @trace_span
+    def __init__(self, parent, settings, options, catalog, folders_index,
+                 existing_files):
         """Prepare the dialog"""
         logging.debug(f'{self.__class__.__name__} init')
         super().__init__(filename='application_picker.ui')
@@ -41,12 +46,24 @@ class UIApplicationPicker(UIBase):
         self.parent = parent
         self.settings = settings
         self.options = options
+        self.catalog = catalog
+        self.folders_index = folders_index
         self.existing_files = existing_files
         self.selected_applications = None
+        # Scores for the applications matching the search or None
+        self.search_results = None
+        # Applications with a search score in the model
+        self.scored_applications = set()
+        self.loader = None
+        self.loader_id = None
         # Load UI
         self.load_ui()
         # Prepare the models
         self.model_applications = ModelApplications(self.ui.store_applications)
+        if self.settings.get_preference(option=PREFERENCES_LAZY_ICONS):
+            self.model_applications.set_lazy_icons(
+                column=self.ui.treeview_column_applications,
+                renderer=self.ui.cell_application_icon)
         # Complete initialization
         self.startup()
 
@@ -63,47 +80,72 @@ class UIApplicationPicker(UIBase):
             buttons=[self.ui.button_add])
         # Set various properties
         self.ui.dialog.set_transient_for(self.parent)
+        self.ui.entry_search.set_placeholder_text(_('Search'))
         # Connect signals from the UI file to the functions with the same name
         self.ui.connect_signals(self)
 
     def startup(self):
         """Complete initialization"""
         logging.debug(f'{self.__class__.__name__} startup')
-        # Prepares the applications list
-        for desktop_entry in Gio.app_info_get_all():
-            try:
-                icon_name = None
-                icon = desktop_entry.get_icon()
-                if isinstance(icon, Gio.ThemedIcon):
-                    # From Gio.ThemedIcon get the icon name only
-                    icons = desktop_entry.get_icon().get_names()
-                    icon_name = icons[0] if icons else None
-                elif isinstance(icon, Gio.FileIcon):
-                    # From Gio.FileIcon get the full file name
-                    icon_name = icon.get_file().get_parse_name()
-                description = (desktop_entry.get_description()
-                               if desktop_entry.get_description() else '')
-                application = ApplicationInfo(desktop_entry.get_id(),
-                                              desktop_entry.get_name(),
-                                              description,
-                                              icon_name,
-                                              desktop_entry.should_show())
-                # Skip existing files
-                if application.filename not in self.existing_files:
-                    self.model_applications.add_data(application)
-            except Exception as e:
-                logging.error(f'{desktop_entry.get_id()}: {e}')
-        self.model_applications.set_all_rows_visibility(
-            self.settings.get_preference(option=APP_PICKER_SHOW_HIDDEN))
         self.model_applications.model.set_sort_column_id(
             self.ui.treeview_column_applications.get_sort_column_id(),
             Gtk.SortType.ASCENDING)
-        self.ui.filter_applications.set_visible_column(
-            ModelApplications.COL_VISIBLE)
+        self.ui.filter_applications.set_visible_func(
+            self.on_filter_applications_visible)
+        self.ui.treeview_column_folders.set_cell_data_func(
+            self.ui.cell_application_folders,
+            self.on_cell_folders_data)
+        # Load the applications list in batches while the dialog is shown,
+        # sorting the list only once after the last batch
+        self.model_applications.suspend_sorting()
+        self.loader = self.do_load_applications()
+        self.loader_id = GLib.idle_add(self.on_idle_load_applications)
         # Restore the saved size and position
         self.settings.restore_window_position(window=self.ui.dialog,
                                               section=SECTION_WINDOW_NAME)
 
+    def do_load_applications(self):
+        """Fill the applications list from the catalog, yielding after
+        every batch"""
+        batch = []
+        for index, total, application in self.catalog.iter_applications():
+            # Skip existing files
+            if application.filename not in self.existing_files:
+                batch.append(application)
+            if (index + 1) % LOADING_BATCH_SIZE == 0:
+                self.do_add_applications(batch)
+                batch = []
+                yield (index + 1) / total
+        self.do_add_applications(batch)
+        self.model_applications.resume_sorting()
+
+    def do_add_applications(self, applications):
+        """Add a batch of applications to the applications list"""
+        show_hidden = self.settings.get_preference(
+            option=APP_PICKER_SHOW_HIDDEN)
+        for treeiter in self.model_applications.add_many(items=applications):
+            if show_hidden:
+                self.model_applications.set_data(
+                    treeiter, ModelApplications.COL_VISIBLE, True)
+
+    @trace_span
+    def on_idle_load_applications(self):
+        """Load a batch of applications and update the progress"""
+        try:
+            fraction = next(self.loader)
+        except StopIteration:
+            self.ui.progress_loading.hide()
+            self.loader_id = None
+            # Search again in the completed search index
+            if self.search_results is not None:
+                self.do_search()
+            return GLib.SOURCE_REMOVE
+        self.ui.progress_loading.set_fraction(fraction)
+        self.ui.progress_loading.set_text(
+            _('Loading applications ({PERCENT}%)').format(
+                PERCENT=int(fraction * 100)))
+        return GLib.SOURCE_CONTINUE
+
     def show(self):
         """Show the dialog"""
         logging.debug(f'{self.__class__.__name__} show')
@@ -114,6 +156,10 @@ class UIApplicationPicker(UIBase):
     def destroy(self):
         """Destroy the dialog"""
         logging.debug(f'{self.__class__.__name__} destroy')
+        # Stop loading the applications list
+        if self.loader_id:
+            GLib.source_remove(self.loader_id)
+            self.loader_id = None
         self.settings.save_window_position(window=self.ui.dialog,
                                            section=SECTION_WINDOW_NAME)
         self.ui.dialog.destroy()
@@ -132,10 +178,76 @@ class UIApplicationPicker(UIBase):
             self.selected_applications.append(application)
         self.ui.dialog.response(Gtk.ResponseType.OK)
 
+    def do_search(self):
+        """Filter the applications list with the search results and select
+        the best match"""
+        self.search_results = self.catalog.search_index.search(
+            self.ui.entry_search.get_text())
+        # The sorting is restored by the loader after the last batch, then
+        # the search is executed again
+        sorting = self.model_applications.suspended_sorting is None
+        if sorting:
+            # Disable the sorting while updating the scores
+            self.model_applications.model.set_sort_column_id(
+                Gtk.TREE_SORTABLE_UNSORTED_SORT_COLUMN_ID,
+                Gtk.SortType.ASCENDING)
+        # Update only the scores of the matching and previously matching
+        # applications
+        scores = self.search_results or {}
+        for application in self.scored_applications | scores.keys():
+            treeiter = self.model_applications.get_iter(application)
+            if treeiter:
+                self.model_applications.set_data(treeiter,
+                                                 ModelApplications.COL_SCORE,
+                                                 scores.get(application, 0.0))
+        self.scored_applications = set(scores)
+        self.ui.filter_applications.refilter()
+        if sorting:
+            if self.search_results:
+                # Show the best matches first
+                self.model_applications.model.set_sort_column_id(
+                    ModelApplications.COL_SCORE, Gtk.SortType.DESCENDING)
+            else:
+                self.model_applications.model.set_sort_column_id(
+                    self.ui.treeview_column_applications.get_sort_column_id(),
+                    Gtk.SortType.ASCENDING)
+        if self.search_results:
+            best_path = None
+            best_score = None
+            for row in self.ui.filter_applications:
+                score = self.search_results[row[ModelApplications.COL_KEY]]
+                if best_score is None or score > best_score:
+                    best_path = row.path
+                    best_score = score
+            if best_path:
+                self.ui.treeview_applications.set_cursor(best_path)
+                self.ui.treeview_applications.scroll_to_cell(
+                    best_path, None, True, 0.5, 0.0)
+
     def on_action_search_activate(self, widget):
-        """Start interactive files search"""
-        self.ui.treeview_applications.grab_focus()
-        self.ui.treeview_applications.emit('start-interactive-search')
+        """Start the applications search"""
+        self.ui.entry_search.grab_focus()
+
+    def on_cell_folders_data(self, column, renderer, model, treeiter, data):
+        """Show the folders already containing an application"""
+        renderer.props.text = ', '.join(self.folders_index.get_titles(
+            model.get_value(treeiter, ModelApplications.COL_KEY)))
+
+    def on_entry_search_activate(self, widget):
+        """Add the selected application when pressing Enter"""
+        if self.ui.action_add.get_sensitive():
+            self.ui.action_add.activate()
+
+    def on_entry_search_search_changed(self, widget):
+        """Filter the applications while typing"""
+        self.do_search()
+
+    def on_filter_applications_visible(self, model, treeiter, data):
+        """Show the valid applications matching the search"""
+        return (model.get_value(treeiter, ModelApplications.COL_VISIBLE) and
+                (self.search_results is None or
+                 model.get_value(treeiter, ModelApplications.COL_KEY)
+                 in self.search_results))
 
     def on_treeview_applications_row_activated(self, widget, path, column):
         """Add the selected application on row activation"""
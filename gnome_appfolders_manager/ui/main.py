@@ -20,21 +20,42 @@
 
 import logging
 
-from gi.repository import Gio
+from gi.repository import GLib
 from gi.repository import Gtk
 
 from gnome_appfolders_manager.constants import (APP_NAME,
                                                 FILE_ICON,
-                                                FILE_SETTINGS,
-                                                SCHEMA_FOLDERS)
+                                                FILE_SETTINGS)
 from gnome_appfolders_manager.functions import get_treeview_selected_row
 from gnome_appfolders_manager.localize import _
 from gnome_appfolders_manager.models.appfolder_info import AppFolderInfo
 from gnome_appfolders_manager.models.appfolders import ModelAppFolders
 from gnome_appfolders_manager.models.application_info import ApplicationInfo
 from gnome_appfolders_manager.models.applications import ModelApplications
-from gnome_appfolders_manager.models.folder_info import FolderInfo
+from gnome_appfolders_manager.models.applications_catalog import (
+    ApplicationsCatalog)
+from gnome_appfolders_manager.models.desktop_index import get_desktop_index
+from gnome_appfolders_manager.models.desktop_monitor import DesktopMonitor
+from gnome_appfolders_manager.models.desktop_resolver import (
+    RESOURCE_DIRECTORIES,
+    get_desktop_resolver)
+from gnome_appfolders_manager.models.folder_info import (
+    OPTION_FOLDER_APPS,
+    OPTION_FOLDER_EXCLUDED_APPS,
+    FolderInfo)
+from gnome_appfolders_manager.models.folders_index import FoldersIndex
+from gnome_appfolders_manager.models.folders_list import (
+    OPTION_FOLDER_CHILDREN,
+    FoldersList)
+from gnome_appfolders_manager.models.folders_report import FoldersReport
+from gnome_appfolders_manager.models.settings_transaction import (
+    settings_transaction)
+from gnome_appfolders_manager.pixbuf_cache import pixbuf_cache
+from gnome_appfolders_manager.profiling import (session_profiler,
+                                                trace_span)
 from gnome_appfolders_manager.settings import (APP_PICKER_SHOW_HIDDEN,
+                                               PREFERENCES_ICONS_CACHE_SIZE,
+                                               PREFERENCES_LAZY_ICONS,
                                                PREFERENCES_SHOW_MISSING,
                                                Settings)
 from gnome_appfolders_manager.ui.about import UIAbout
@@ -42,10 +63,13 @@ from gnome_appfolders_manager.ui.application_picker import UIApplicationPicker
 from gnome_appfolders_manager.ui.base import UIBase
 from gnome_appfolders_manager.ui.create_appfolder import UICreateAppFolder
 from gnome_appfolders_manager.ui.message_dialog import (show_message_dialog,
-                                                        UIMessageDialogNoYes)
+                                                        UIMessageDialogNoYes,
+                                                        UIMessageDialogOK)
 from gnome_appfolders_manager.ui.shortcuts import UIShortcuts
 
 SECTION_WINDOW_NAME = 'main'
+# Milliseconds to wait for more settings changes before applying them
+SETTINGS_CHANGES_DELAY = 250
 
 
 class UIMain(UIBase):
@@ -57,6 +81,22 @@ class UIMain(UIBase):
         self.application = application
         self.options = options
         self.folders = {}
+        # Settings changed handler id for each folder
+        self.folders_handlers = {}
+        self.folders_list = FoldersList()
+        # Folders containing each application
+        self.folders_index = FoldersIndex()
+        # Folders matching the last folders search
+        self.search_folders_key = None
+        self.search_folders = set()
+        # Settings changes waiting to be applied
+        self.changed_folders_list = False
+        self.changed_folders = set()
+        self.changed_settings_id = None
+        self.desktop_monitor = DesktopMonitor(
+            callback=self.on_desktop_files_changed)
+        # Installed applications shared by the application pickers
+        self.catalog = ApplicationsCatalog()
         # Load settings
         self.settings = Settings(filename=FILE_SETTINGS,
                                  case_sensitive=True)
@@ -67,6 +107,10 @@ class UIMain(UIBase):
         # Prepare the models
         self.model_folders = ModelAppFolders(self.ui.store_folders)
         self.model_applications = ModelApplications(self.ui.store_applications)
+        if self.settings.get_preference(option=PREFERENCES_LAZY_ICONS):
+            self.model_applications.set_lazy_icons(
+                column=self.ui.treeview_column_applications,
+                renderer=self.ui.cell_application_icon)
         # Complete initialization
         self.startup()
 
@@ -96,6 +140,9 @@ class UIMain(UIBase):
             Gtk.SortType.ASCENDING)
         self.ui.treeview_column_applications.set_clickable(False)
         self.ui.treeview_column_applications.set_sort_indicator(False)
+        # Search the folders also by their applications
+        self.ui.treeview_folders.set_search_equal_func(
+            self.on_treeview_folders_search_equal)
         # Connect signals from the UI file to the functions with the same name
         self.ui.connect_signals(self)
 
@@ -112,8 +159,16 @@ class UIMain(UIBase):
         for setting_name, action in self.settings_map.items():
             action.set_active(self.settings.get_preference(
                 option=setting_name))
+        # Set the icons cache size in MiB
+        pixbuf_cache.set_budget(self.settings.get_preference(
+            option=PREFERENCES_ICONS_CACHE_SIZE) * 1024 * 1024)
         # Detect the AppFolders and select the first one automatically
         self.do_reload_folders()
+        self.folders_list.settings.connect(
+            f'changed::{OPTION_FOLDER_CHILDREN}',
+            self.on_settings_folders_list_changed)
+        # Follow the installed desktop files changes
+        self.desktop_monitor.start()
         if len(self.model_folders) > 0:
             self.ui.treeview_folders.set_cursor(0)
         self.ui.treeview_folders.grab_focus()
@@ -126,17 +181,137 @@ class UIMain(UIBase):
         logging.debug(f'{self.__class__.__name__} run')
         self.ui.window.show_all()
 
+    @trace_span
     def do_reload_folders(self):
-        """Reload the Application Folders"""
-        self.folders = {}
-        self.model_folders.clear()
-        settings_folders = Gio.Settings.new(SCHEMA_FOLDERS)
-        list_folders = settings_folders.get_strv('folder-children')
+        """Reconcile the Application Folders with the folders list"""
+        list_folders = self.folders_list.get_folders()
+        # Check for changed desktop-directories only once for every folder
+        get_desktop_resolver(RESOURCE_DIRECTORIES).refresh()
+        # Remove the folders no longer existing
+        for folder_name in list(self.folders):
+            if folder_name not in list_folders:
+                self.do_remove_folder(folder_name)
+                treeiter = self.model_folders.get_iter(folder_name)
+                if treeiter:
+                    self.model_folders.remove(treeiter)
+        # Update the existing folders and add the new folders
+        appfolders = []
         for folder_name in list_folders:
-            folder_info = FolderInfo(folder_name)
-            appfolder = AppFolderInfo(folder_info)
-            self.model_folders.add_data(appfolder)
-            self.folders[folder_info.folder] = folder_info
+            if folder_name in self.folders:
+                folder_info = self.folders[folder_name]
+                self.model_folders.update_data(AppFolderInfo(folder_info))
+            else:
+                folder_info = FolderInfo(folder_name)
+                appfolders.append(AppFolderInfo(folder_info))
+                self.folders[folder_info.folder] = folder_info
+                self.folders_handlers[folder_name] = (
+                    folder_info.settings.connect(
+                        'changed',
+                        self.on_settings_folder_changed,
+                        folder_name))
+            self.do_index_folder(folder_info)
+        self.model_folders.add_many(items=appfolders)
+
+    def do_remove_folder(self, folder_name):
+        """Forget a removed folder and stop monitoring its settings"""
+        folder_info = self.folders.pop(folder_name)
+        folder_info.settings.disconnect(
+            self.folders_handlers.pop(folder_name))
+        self.folders_index.remove_folder(folder_name)
+
+    def do_index_folder(self, folder_info):
+        """Update the applications of a folder in the folders index"""
+        self.folders_index.set_folder(folder=folder_info.folder,
+                                      title=folder_info.get_name(),
+                                      applications=folder_info.apps)
+        self.search_folders_key = None
+
+    def do_search_folders(self, key):
+        """Return the folders containing the applications matching a
+        casefolded search key by id or name"""
+        desktop_index = get_desktop_index()
+        result = set()
+        for application, folders in self.folders_index.applications.items():
+            entry = desktop_index.get_entry(application)
+            if (key in application.casefold() or
+                    (entry and key in entry.name.casefold())):
+                result.update(folders)
+        return result
+
+    def get_application_info(self, application, desktop_file, category):
+        """Return the ApplicationInfo for a folder application or None if
+        the desktop file is missing and the missing files are hidden"""
+        if desktop_file or self.settings.get_preference(
+                option=PREFERENCES_SHOW_MISSING):
+            return ApplicationInfo(
+                application,
+                desktop_file.name
+                if desktop_file else 'Missing desktop file',
+                desktop_file.comment
+                if desktop_file else application,
+                desktop_file.icon_name
+                if desktop_file else None,
+                # Always show any application, also if hidden
+                True,
+                category)
+
+    def do_update_applications(self, applications):
+        """Update the changed applications in the selected folder"""
+        selected_row = get_treeview_selected_row(self.ui.treeview_folders)
+        if not selected_row:
+            return
+        folder_info = self.folders.get(self.model_folders.get_key(
+            selected_row))
+        if not folder_info:
+            return
+        # Add or remove rows only when the folder has no unsaved changes
+        modified = self.ui.action_files_save.get_sensitive()
+        desktop_index = get_desktop_index()
+        # The changed desktop files could also match the folder categories
+        membership = folder_info.get_effective_applications()
+        for application in applications:
+            application_info = None
+            if application in membership:
+                application_info = self.get_application_info(
+                    application,
+                    desktop_index.get_entry(application),
+                    membership[application])
+            treeiter = self.model_applications.get_iter(application)
+            if treeiter and application_info:
+                self.model_applications.update_data(application_info)
+            elif treeiter and not modified:
+                self.model_applications.remove(treeiter)
+            elif application_info and not modified:
+                self.model_applications.add_data(application_info)
+
+    def do_apply_settings_changes(self):
+        """Apply the settings changes made outside the application"""
+        self.changed_settings_id = None
+        if self.changed_folders_list:
+            self.changed_folders_list = False
+            self.do_reload_folders()
+        selected_row = get_treeview_selected_row(self.ui.treeview_folders)
+        selected_folder = (self.model_folders.get_key(selected_row)
+                           if selected_row else None)
+        for folder_name in self.changed_folders:
+            if folder_name in self.folders:
+                folder_info = self.folders[folder_name]
+                folder_info.reload()
+                self.model_folders.update_data(AppFolderInfo(folder_info))
+                self.do_index_folder(folder_info)
+                # Reload the selected folder applications if not modified
+                if (folder_name == selected_folder and
+                        not self.ui.action_files_save.get_sensitive()):
+                    self.on_treeview_folders_cursor_changed(
+                        self.ui.treeview_folders)
+        self.changed_folders.clear()
+        return GLib.SOURCE_REMOVE
+
+    def do_schedule_settings_changes(self):
+        """Coalesce the settings changes to apply them only once"""
+        if self.changed_settings_id is None:
+            self.changed_settings_id = GLib.timeout_add(
+                SETTINGS_CHANGES_DELAY, self.do_apply_settings_changes)
 
     def on_action_about_activate(self, widget):
         """Show the information dialog"""
@@ -156,9 +331,13 @@ class UIMain(UIBase):
     def on_action_quit_activate(self, widget):
         """Save the settings and close the application"""
         logging.debug(f'{self.__class__.__name__} quit')
+        pixbuf_cache.log_statistics()
+        self.desktop_monitor.stop()
         self.settings.save_window_position(window=self.ui.window,
                                            section=SECTION_WINDOW_NAME)
         self.settings.save()
+        session_profiler.save(cpu_filename=self.options.profile_cpu,
+                              memory_filename=self.options.profile_memory)
         self.ui.window.destroy()
         self.application.quit()
 
@@ -185,19 +364,18 @@ class UIMain(UIBase):
             parent=self.ui.window,
             settings=self.settings,
             options=self.options,
+            catalog=self.catalog,
+            folders_index=self.folders_index,
             existing_files=self.model_applications.rows.keys())
         if dialog.show() == Gtk.ResponseType.OK:
             if dialog.selected_applications:
-                treeiter = None
-                for application in dialog.selected_applications:
-                    # Get the selected application in the application picker
-                    # and add it to the current AppFolder
-                    application_info = dialog.model_applications.items[
-                        application]
-                    self.model_applications.add_data(application_info)
-                    # Automatically select the newly added application
-                    filename = application_info.filename
-                    treeiter = self.model_applications.rows[filename]
+                # Get the selected applications in the application picker
+                # and add them to the current AppFolder
+                self.model_applications.add_many(
+                    items=[dialog.model_applications.items[application]
+                           for application in dialog.selected_applications])
+                treeiter = self.model_applications.get_iter(
+                    dialog.selected_applications[-1])
                 if treeiter:
                     # Automatically select the last added application
                     self.ui.treeview_applications.set_cursor(
@@ -220,7 +398,23 @@ class UIMain(UIBase):
         if selected_row:
             folder_name = self.model_folders.get_key(selected_row)
             folder_info = self.folders[folder_name]
-            folder_info.set_applications(self.model_applications.rows.keys())
+            applications = self.model_applications.rows.keys()
+            # Save only the applications not included by the categories
+            items = self.model_applications.items
+            options = {OPTION_FOLDER_APPS: [
+                application for application in applications
+                if items[application].category is None]}
+            if folder_info.has_option(OPTION_FOLDER_EXCLUDED_APPS):
+                # Exclude the removed applications matching the categories
+                excluded = [application
+                            for application in folder_info.excluded_apps
+                            if application not in applications]
+                excluded.extend(sorted(
+                    folder_info.get_category_applications().difference(
+                        applications, excluded)))
+                options[OPTION_FOLDER_EXCLUDED_APPS] = excluded
+            folder_info.set_options(options)
+            self.do_index_folder(folder_info)
         # Disable folder content saving
         self.ui.action_files_save.set_sensitive(False)
 
@@ -237,16 +431,17 @@ class UIMain(UIBase):
             options=self.options,
             existing_folders=self.model_folders.rows.keys())
         if dialog.show(name='', title='') == Gtk.ResponseType.OK:
-            # Create a new FolderInfo object and set its title
+            # Create a new FolderInfo object, set its title and add the
+            # folder to the folders list
             folder_info = FolderInfo(dialog.folder_name)
-            folder_info.set_title(dialog.folder_title)
-            # Add the folder to the folders list
-            settings_folders = Gio.Settings.new(SCHEMA_FOLDERS)
-            list_folders = settings_folders.get_strv('folder-children')
-            list_folders.append(dialog.folder_name)
-            settings_folders.set_strv('folder-children', list_folders)
-            # Reload folders list
+            with settings_transaction(folder_info.settings,
+                                      self.folders_list.settings):
+                folder_info.set_title(dialog.folder_title)
+                self.folders_list.add_folder(dialog.folder_name)
+            # Reload folders list and select the new folder
             self.do_reload_folders()
+            self.ui.treeview_folders.set_cursor(
+                self.model_folders.get_path_by_name(dialog.folder_name))
         dialog.destroy()
 
     def on_action_folders_properties_activate(self, widget):
@@ -265,12 +460,10 @@ class UIMain(UIBase):
                 folder_title = dialog.folder_title
                 # Update the folder title
                 folder_info = self.folders[folder_name]
-                folder_info.name = folder_title
                 folder_info.set_title(folder_title)
-                # Reload the folders list and select the folder again
+                self.do_index_folder(folder_info)
+                # Reload the folders list keeping the selected folder
                 self.do_reload_folders()
-                self.ui.treeview_folders.set_cursor(
-                    self.model_folders.get_path_by_name(folder_name))
             dialog.destroy()
 
     def on_action_folders_remove_activate(self, widget):
@@ -287,20 +480,106 @@ class UIMain(UIBase):
                                           'the folder {FOLDER}?').format(
                                        FOLDER=folder_name),
                                    is_response_id=Gtk.ResponseType.YES):
-                # Remove the AppFolder from settings
+                # Remove the AppFolder from settings and remove the folder
+                # name from the folders list
                 folder_info = self.folders[folder_name]
-                folder_info.remove()
-                self.folders.pop(folder_name)
-                # Remove the folder name from the folders list
-                settings_folders = Gio.Settings.new(SCHEMA_FOLDERS)
-                list_folders = settings_folders.get_strv('folder-children')
-                list_folders.remove(folder_name)
-                settings_folders.set_strv('folder-children', list_folders)
+                with settings_transaction(folder_info.settings,
+                                          self.folders_list.settings):
+                    folder_info.remove()
+                    self.folders_list.remove_folder(folder_name)
+                self.do_remove_folder(folder_name)
                 # Clear the applications model
                 self.model_applications.clear()
                 # Remove the folder from the folders model
                 self.model_folders.remove(selected_row)
 
+    def on_action_folders_report_activate(self, widget):
+        """Report the duplicated applications and the folders conflicts"""
+        report = FoldersReport(folders_list=self.folders_list)
+        report.scan()
+        if not report.has_issues():
+            show_message_dialog(class_=UIMessageDialogOK,
+                                parent=self.ui.window,
+                                message_type=Gtk.MessageType.INFO,
+                                title=None,
+                                msg1=_('No issues found'),
+                                msg2=_('Every application is shown in a '
+                                       'single folder.'))
+            return
+        titles = report.folders_index.titles
+        issues = []
+        for application, folders in report.duplicates.items():
+            issues.append(_('{APP} is in the folders {FOLDERS}').format(
+                APP=application,
+                FOLDERS=', '.join(titles[folder] for folder in folders)))
+        for folder, applications in report.redundant.items():
+            for application in applications:
+                issues.append(_('{APP} is already included by the '
+                                'categories of {FOLDER}').format(
+                    APP=application,
+                    FOLDER=titles[folder]))
+        for folder in report.unresolved:
+            issues.append(_('{FOLDER} has a missing directory file '
+                            '{NAME}').format(
+                FOLDER=titles[folder],
+                NAME=report.folders[folder].name))
+        for application, folders in report.unfixable.items():
+            issues.append(_('{APP} cannot be excluded from the categories '
+                            'of {FOLDERS}').format(
+                APP=application,
+                FOLDERS=', '.join(titles[folder] for folder in folders)))
+        if len(issues) > 15:
+            issues[15:] = [_('and {COUNT} more issues').format(
+                COUNT=len(issues) - 15)]
+        if self.ui.action_files_save.get_sensitive():
+            # The fixes would be overwritten when saving the folder later
+            show_message_dialog(class_=UIMessageDialogOK,
+                                parent=self.ui.window,
+                                message_type=Gtk.MessageType.WARNING,
+                                title=None,
+                                msg1=_('Save the folder changes before '
+                                       'fixing the issues'),
+                                msg2='\n'.join(issues))
+        elif show_message_dialog(class_=UIMessageDialogNoYes,
+                                 parent=self.ui.window,
+                                 message_type=Gtk.MessageType.QUESTION,
+                                 title=None,
+                                 msg1=_('Fix the folders issues?'),
+                                 msg2='\n'.join(issues),
+                                 is_response_id=Gtk.ResponseType.YES):
+            report.apply(report.get_fixes())
+            # Read again the fixed folders
+            for folder_info in self.folders.values():
+                folder_info.reload()
+            self.do_reload_folders()
+            self.on_treeview_folders_cursor_changed(self.ui.treeview_folders)
+
+    def on_desktop_files_changed(self, resource, desktop_ids):
+        """Update the folders and applications with changed desktop files"""
+        if resource == RESOURCE_DIRECTORIES:
+            for folder_info in self.folders.values():
+                if folder_info.name in desktop_ids:
+                    folder_info.reload()
+                    self.model_folders.update_data(AppFolderInfo(folder_info))
+                    self.do_index_folder(folder_info)
+        else:
+            self.do_update_applications(desktop_ids)
+
+    def on_settings_folders_list_changed(self, settings, key):
+        """The folders list was changed"""
+        if self.folders_list.get_folders() != list(self.folders):
+            self.changed_folders_list = True
+            self.do_schedule_settings_changes()
+
+    def on_settings_folder_changed(self, settings, key, folder_name):
+        """A folder key was changed"""
+        folder_info = self.folders.get(folder_name)
+        # Skip the changes already known, like those made by this application
+        if folder_info and folder_info.is_option_changed(key):
+            self.changed_folders.add(folder_name)
+            self.do_schedule_settings_changes()
+
+    @trace_span
     def on_treeview_folders_cursor_changed(self, widget):
         selected_row = get_treeview_selected_row(self.ui.treeview_folders)
         if selected_row:
@@ -309,29 +588,35 @@ class UIMain(UIBase):
             # (model erased while the cursor moves through the Gtk.TreeView)
             if folder_name in self.folders:
                 folder_info = self.folders[folder_name]
-                # Clear any previous application icon
-                self.model_applications.clear()
                 # Add new application icons
-                applications = folder_info.get_applications()
-                for application in applications:
-                    desktop_file = applications[application]
-                    if desktop_file or self.settings.get_preference(
-                            option=PREFERENCES_SHOW_MISSING):
-                        application_file = applications[application]
-                        application_info = ApplicationInfo(
-                            application,
-                            application_file.getName()
-                            if desktop_file else 'Missing desktop file',
-                            application_file.getComment()
-                            if desktop_file else application,
-                            application_file.getIcon()
-                            if desktop_file else None,
-                            # Always show any application, also if hidden
-                            True)
-                        self.model_applications.add_data(application_info)
+                desktop_index = get_desktop_index()
+                applications = folder_info.get_effective_applications()
+                applications_info = []
+                for application, category in applications.items():
+                    application_info = self.get_application_info(
+                        application,
+                        desktop_index.get_entry(application),
+                        category)
+                    if application_info:
+                        applications_info.append(application_info)
+                # Replace any previous application icon
+                self.model_applications.replace_all(
+                    items=applications_info,
+                    treeview=self.ui.treeview_applications)
             # Disable folder content saving
             self.ui.action_files_save.set_sensitive(False)
 
+    def on_treeview_folders_search_equal(self, model, column, key, treeiter):
+        """Match the folders by title or by their applications, returning
+        False for the matching rows"""
+        key = key.casefold()
+        if key != self.search_folders_key:
+            self.search_folders_key = key
+            self.search_folders = self.do_search_folders(key)
+        return not (key in model.get_value(treeiter, column).casefold() or
+                    self.model_folders.get_key(treeiter) in
+                    self.search_folders)
+
     def on_treeview_folders_row_activated(self, widget, path, column):
         """Show folder properties on activation"""
         self.ui.action_folders_properties.activate()
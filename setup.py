@@ -20,10 +20,12 @@
 ##
 
 import itertools
+import json
 import pathlib
 import setuptools
 import setuptools.command.install_scripts
 import subprocess
+import sys
 
 # Importing distutils after setuptools uses the setuptools distutils
 from distutils.command.install_data import install_data
@@ -206,6 +208,81 @@ class CommandTranslations(setuptools.Command):
                              file_po))
 
 
+class CommandCheckImportTime(setuptools.Command):
+    description = "check the modules import time"
+    user_options = [
+        ('modules=', 'm', 'comma separated list of modules to import'),
+        ('budget=', 'b', 'maximum import time in milliseconds'),
+        ('repeat=', 'r', 'number of measures (the best one is used)'),
+        ('forbidden=', 'f', 'comma separated list of forbidden modules')]
+
+    def initialize_options(self):
+        self.modules = ('gnome_appfolders_manager.main,'
+                        'gnome_appfolders_manager.cli')
+        self.budget = 250
+        self.repeat = 5
+        self.forbidden = 'gi.repository.Gtk,gi.repository.GdkPixbuf'
+
+    def finalize_options(self):
+        self.modules = self.modules.split(',')
+        self.budget = float(self.budget)
+        self.repeat = int(self.repeat)
+        self.forbidden = self.forbidden.split(',')
+
+    def measure(self):
+        """Import the modules in a new interpreter and return the import
+        time in milliseconds (None if not available) and the imported
+        modules"""
+        code = (f'import {", ".join(self.modules)}\n'
+                'import json, sys\n'
+                'print(json.dumps(list(sys.modules)))')
+        process = subprocess.run((sys.executable,
+                                  '-X', 'importtime',
+                                  '-c', code),
+                                 stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE,
+                                 universal_newlines=True,
+                                 check=True)
+        elapsed = None
+        for line in process.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            fields = line.split('|')
+            if len(fields) != 3 or not fields[1].strip().isdigit():
+                continue
+            elapsed = elapsed or 0
+            name = fields[2][1:]
+            # Only the outer imports of the package are added, as the
+            # cumulative time already includes the nested imports
+            if name.startswith('gnome_appfolders_manager'):
+                elapsed += int(fields[1])
+        # The modules are listed by the interpreter itself, as the import
+        # time lines are missing before Python 3.7
+        modules = set(json.loads(process.stdout.splitlines()[-1]))
+        return (elapsed / 1000 if elapsed is not None else None), modules
+
+    def run(self):
+        results = [self.measure() for _ in range(self.repeat)]
+        forbidden = sorted(results[0][1].intersection(self.forbidden))
+        if forbidden:
+            raise setuptools.distutils.errors.DistutilsError(
+                f'forbidden modules imported: {", ".join(forbidden)}')
+        if results[0][0] is None:
+            if sys.version_info < (3, 7):
+                setuptools.distutils.log.warn(
+                    'import time not checked: -X importtime requires '
+                    'Python 3.7')
+                return
+            raise setuptools.distutils.errors.DistutilsError(
+                'no import time measured')
+        elapsed = min(result[0] for result in results)
+        setuptools.distutils.log.info(
+            f'import time: {elapsed:.1f} ms (budget {self.budget:.1f} ms)')
+        if elapsed > self.budget:
+            raise setuptools.distutils.errors.DistutilsError(
+                f'import time {elapsed:.1f} ms exceeds the budget '
+                f'of {self.budget:.1f} ms')
+
+
 setuptools.setup(
     name=APP_NAME,
     version=APP_VERSION,
@@ -241,6 +318,7 @@ setuptools.setup(
         'install_data': InstallData,
         'create_pot': CommandCreatePOT,
         'create_po': CommandCreatePO,
-        'translations': CommandTranslations
+        'translations': CommandTranslations,
+        'check_importtime': CommandCheckImportTime
     }
 )